@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        import api.signals  # noqa: F401
+        from django.core.signals import request_started
+        from fg.db import check_connections
+        request_started.connect(check_connections)
+        from api.pdf import register_fonts
+        register_fonts()
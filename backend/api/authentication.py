@@ -0,0 +1,120 @@
+"""Token authentication without a database round trip per request.
+
+Token -> user lookups are kept for TOKEN_CACHE_TTL seconds, in a bounded
+LRU of the current process by default. Deleting a token (djoser logout) or
+saving its user (deactivation, permission changes) drops the entry right
+away in that process; other workers may keep serving it until the TTL runs
+out. Point TOKEN_CACHE_ALIAS at a shared cache to make those invalidations
+immediate everywhere.
+
+Entries hold field values only: every request gets its own Token and User
+instances, so whatever a request caches on or changes in them stays there.
+"""
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+CACHE_KEY = 'auth-token:{digest}'
+
+
+def get_cache_key(key):
+    """Raw tokens stay out of the shared cache."""
+    return CACHE_KEY.format(digest=sha256(key.encode()).hexdigest())
+
+
+def freeze(token):
+    """Database and field values of the token and of its user."""
+    return tuple(
+        (instance._state.db, tuple(
+            getattr(instance, field.attname)
+            for field in instance._meta.concrete_fields
+        ))
+        for instance in (token, token.user)
+    )
+
+
+def thaw(frozen):
+    """Fresh Token with its user attached, as if just fetched."""
+    instances = [
+        model.from_db(db, [
+            field.attname for field in model._meta.concrete_fields
+        ], values)
+        for model, (db, values) in zip((Token, get_user_model()), frozen)
+    ]
+    token, token.user = instances
+    return token
+
+
+class TokenCache:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def shared(self):
+        alias = settings.TOKEN_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def get(self, key):
+        """Token with its user attached, or None."""
+        if self.shared is not None:
+            frozen = self.shared.get(get_cache_key(key))
+            return None if frozen is None else thaw(frozen)
+        with self._lock:
+            frozen, expires = self._entries.get(key, (None, 0))
+            if frozen is None:
+                return None
+            if expires < monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return thaw(frozen)
+
+    def set(self, key, token):
+        if self.shared is not None:
+            self.shared.set(
+                get_cache_key(key), freeze(token), settings.TOKEN_CACHE_TTL
+            )
+            return
+        with self._lock:
+            self._entries[key] = (
+                freeze(token), monotonic() + settings.TOKEN_CACHE_TTL
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.TOKEN_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        if self.shared is not None:
+            self.shared.delete_many([get_cache_key(key) for key in keys])
+            return
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, token)
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        return token.user, token
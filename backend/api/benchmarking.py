@@ -0,0 +1,168 @@
+"""Synthetic data and measurement helpers for the benchmark commands."""
+import csv
+import os
+from contextlib import contextmanager
+from datetime import timedelta
+from time import perf_counter
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import (CaptureQueriesContext, setup_test_environment,
+                               teardown_test_environment)
+
+from recipes.models import (Favorite, Ingredient, IngredientPerRecipe,
+                            Recipe, Tag)
+from shopping.models import ShoppingList
+from users.models import Follow, User
+
+BUNDLED_INGREDIENTS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'recipes', 'static', 'data', 'ingredients.csv'
+)
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """Run the block against a throwaway test database, never the real one."""
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0,
+        autoclobber=True,
+        serialize=False,
+        keepdb=keepdb,
+    )
+    for replica in connections.all():
+        if replica.settings_dict['TEST']['MIRROR'] == DEFAULT_DB_ALIAS:
+            replica.creation.set_as_test_mirror(connection.settings_dict)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(
+            old_name,
+            verbosity=0,
+            keepdb=keepdb,
+        )
+        teardown_test_environment()
+
+
+@contextmanager
+def measure():
+    """Collect {'queries': <number>, 'seconds': <wall time>} of the block."""
+    result = {}
+    with CaptureQueriesContext(connection) as context:
+        start = perf_counter()
+        yield result
+        result['seconds'] = perf_counter() - start
+    result['queries'] = len(context.captured_queries)
+
+
+def percentile(timings, share):
+    """Nearest-rank percentile, <share> being 0.5 for p50 and so on."""
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def seed_users(count, prefix='bench'):
+    User.objects.bulk_create(
+        (User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com')
+         for i in range(count)),
+    )
+    return list(
+        User.objects.filter(username__startswith=prefix).order_by('pk')
+    )
+
+
+def seed_ingredients(count, prefix='ингредиент'):
+    units = [code for code, _ in Ingredient.UNIT_CHOICES]
+    Ingredient.objects.bulk_create(
+        (Ingredient(name=f'{prefix} {i}', unit=units[i % len(units)])
+         for i in range(count)),
+    )
+    return list(
+        Ingredient.objects.filter(name__startswith=prefix).order_by('pk')
+    )
+
+
+def seed_bundled_ingredients():
+    """Load the ~2 200 real ingredient names shipped with the project."""
+    units = {unit: code for code, unit in Ingredient.UNIT_CHOICES}
+    with open(BUNDLED_INGREDIENTS, encoding='utf8') as file:
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, unit=units[unit])
+            for name, unit in csv.reader(file) if unit in units
+        )
+    return list(Ingredient.objects.order_by('pk'))
+
+
+def seed_tags(count):
+    Tag.objects.bulk_create(
+        Tag(name=f'тэг {i}', slug=f'tag-{i}', color=i) for i in range(count)
+    )
+    return list(Tag.objects.order_by('pk'))
+
+
+def tag_recipes(recipes, tags, per_recipe=2):
+    """Give every recipe <per_recipe> tags round-robin."""
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe=recipe, tag=tags[(i + j) % len(tags)])
+        for i, recipe in enumerate(recipes)
+        for j in range(min(per_recipe, len(tags)))
+    )
+
+
+def seed_recipes(authors, ingredients, count, per_recipe=5, prefix='bench'):
+    """Create <count> recipes spread over <authors>, <per_recipe> each."""
+    Recipe.objects.bulk_create(
+        (Recipe(
+            title=f'{prefix} {i}',
+            description=f'{prefix} recipe number {i}',
+            cooking_time=timedelta(minutes=i % 120 + 1),
+            image=f'recipes/{prefix}-{i}.jpg',
+            author=authors[i % len(authors)],
+        ) for i in range(count)),
+    )
+    recipes = list(
+        Recipe.objects.filter(title__startswith=prefix).order_by('pk')
+    )
+    IngredientPerRecipe.objects.bulk_create(
+        (IngredientPerRecipe(
+            recipe=recipe,
+            ingredient=ingredients[(i + j) % len(ingredients)],
+            amount=j + 1,
+        ) for i, recipe in enumerate(recipes)
+            for j in range(min(per_recipe, len(ingredients)))),
+    )
+    return recipes
+
+
+def seed_follows(users, per_user=5):
+    """Every user follows the next <per_user> users round-robin."""
+    Follow.objects.bulk_create(
+        Follow(user=user, author=users[(i + j + 1) % len(users)])
+        for i, user in enumerate(users)
+        for j in range(min(per_user, len(users) - 1))
+    )
+
+
+def seed_favorites(users, recipes, per_user=10):
+    Favorite.objects.bulk_create(
+        Favorite(user=user, recipe=recipes[(i * per_user + j) % len(recipes)])
+        for i, user in enumerate(users)
+        for j in range(min(per_user, len(recipes)))
+    )
+
+
+def seed_shopping_lists(users, recipes, per_user=3):
+    """A shopping list of <per_user> recipes for every user."""
+    ShoppingList.objects.bulk_create(
+        ShoppingList(owner=user) for user in users
+    )
+    lists = ShoppingList.objects.order_by('pk')
+    ShoppingList.recipes.through.objects.bulk_create(
+        ShoppingList.recipes.through(
+            shoppinglist=shopping_list,
+            recipe=recipes[(i * per_user + j) % len(recipes)],
+        )
+        for i, shopping_list in enumerate(lists)
+        for j in range(min(per_user, len(recipes)))
+    )
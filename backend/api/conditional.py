@@ -0,0 +1,55 @@
+from hashlib import sha1
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from api.versions import get_versions, user_scope
+
+
+class ConditionalResponseMixin:
+    """ETag and Last-Modified of list/retrieve taken from api.versions.
+
+    The validators are known before the view runs, so a matching
+    If-None-Match or If-Modified-Since is answered with 304 without
+    touching the database or the serializers.
+    """
+    conditional_actions = ('list', 'retrieve')
+    version_scopes = ()
+    per_user = False
+
+    def get_version_scopes(self):
+        scopes = list(self.version_scopes)
+        if self.per_user and self.request.user.is_authenticated:
+            scopes.append(user_scope(self.request.user.pk))
+        return scopes
+
+    def get_validators(self):
+        versions = get_versions(*self.get_version_scopes())
+        digest = sha1(repr(
+            (self.request.user.pk, self.per_user, versions)
+        ).encode()).hexdigest()
+        return quote_etag(digest), int(max(versions))
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        if self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            if self.per_user:
+                patch_vary_headers(response, ('Authorization',))
+        return response
@@ -0,0 +1,90 @@
+"""Shopping list export formats, chosen by ?format= or the Accept header.
+
+Every exporter is a DRF renderer of calculate_ingredients() rows, so adding
+a format only takes a decorated class here.
+"""
+import csv
+import json
+from abc import ABCMeta, abstractmethod
+from io import StringIO
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from api.pdf import render_shopping_list
+
+EXPORTERS = []
+TEXT_LINE = '{name} — {amount} {measurement_unit}\n'
+CSV_FIELDS = ('name', 'measurement_unit', 'amount')
+
+
+def register_exporter(exporter):
+    """The first registered exporter is served when the client has no say."""
+    EXPORTERS.append(exporter)
+    return exporter
+
+
+class ShoppingListExporter(BaseRenderer, metaclass=ABCMeta):
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.exception:
+            response['Content-Type'] = JSONRenderer.media_type
+            return JSONRenderer().render(data)
+        return self.export(data)
+
+    @abstractmethod
+    def export(self, rows):
+        """Bytes of the file made of calculate_ingredients() rows."""
+
+
+@register_exporter
+class PDFExporter(ShoppingListExporter):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+    render_style = 'binary'
+
+    def export(self, rows):
+        return render_shopping_list(rows)
+
+
+@register_exporter
+class TextExporter(ShoppingListExporter):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def export(self, rows):
+        return ''.join(
+            TEXT_LINE.format(
+                name=row['name'].capitalize(),
+                amount=row['amount'],
+                measurement_unit=row['measurement_unit']
+            ) for row in rows
+        ).encode(self.charset)
+
+
+@register_exporter
+class CSVExporter(ShoppingListExporter):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def export(self, rows):
+        buffer = StringIO()
+        writer = csv.DictWriter(
+            buffer,
+            fieldnames=CSV_FIELDS,
+            extrasaction='ignore'
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue().encode(self.charset)
+
+
+@register_exporter
+class JSONExporter(ShoppingListExporter):
+    media_type = 'application/json'
+    format = 'json'
+
+    def export(self, rows):
+        return json.dumps(rows, ensure_ascii=False).encode(self.charset)
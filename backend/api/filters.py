@@ -0,0 +1,147 @@
+from django.db import connection
+from django.db.models import (Case, Exists, F, IntegerField, OuterRef,
+                              When)
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from recipes.models import Favorite, Recipe
+from recipes.search import search_recipes
+from shopping.models import ShoppingList
+
+INGREDIENT_SEARCH_LIMIT = 50
+PREFIX_MATCH = 0
+SUBSTRING_MATCH = 1
+TRUE_VALUES = ('1', 'true', 'True')
+POPULAR = 'popular'
+POPULARITY_ORDERING = ('popularity',)
+RECIPE_SEARCH_PARAM = 'search'
+RELEVANCE_ORDERING = ('-rank', '-pub_date', '-id')
+
+
+def favorited_by(user):
+    return Exists(Favorite.objects.filter(user=user, recipe=OuterRef('pk')))
+
+
+def in_shopping_cart_of(user):
+    return Exists(ShoppingList.recipes.through.objects.filter(
+        shoppinglist__owner=user,
+        recipe=OuterRef('pk')
+    ))
+
+
+def tagged_with(slugs):
+    return Recipe.tags.through.objects.filter(
+        tag__slug__in=slugs
+    ).values('recipe')
+
+
+class RecipeFilter(BaseFilterBackend):
+    """tags, author, is_favorited and is_in_shopping_cart query params.
+
+    Multi-valued relations are checked with IN/EXISTS subqueries, so recipe
+    rows are never multiplied by a join and need no DISTINCT over wide
+    columns.
+    is_favorited and is_in_shopping_cart reuse the flags annotated by
+    RecipeViewSet.get_queryset when they are there.
+    """
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        tags = params.getlist('tags')
+        if tags:
+            queryset = queryset.filter(pk__in=tagged_with(tags))
+        author = params.get('author')
+        if author is not None:
+            if not author.isdecimal():
+                return queryset.none()
+            queryset = queryset.filter(author=author)
+        flags = (
+            ('is_favorited', 'favorited', favorited_by),
+            ('is_in_shopping_cart', 'in_shopping_cart', in_shopping_cart_of),
+        )
+        for param, annotation, expression in flags:
+            if params.get(param) not in TRUE_VALUES:
+                continue
+            if request.user.is_anonymous:
+                return queryset.none()
+            if annotation not in queryset.query.annotations:
+                queryset = queryset.annotate(
+                    **{annotation: expression(request.user)}
+                )
+            queryset = queryset.filter(**{annotation: True})
+        return queryset
+
+
+def is_popular_ordering(request):
+    return (request.query_params.get(api_settings.ORDERING_PARAM)
+            == POPULAR)
+
+
+class RecipeOrderingFilter(BaseFilterBackend):
+    """?ordering=popular pages through the precomputed RecipeRanking.
+
+    Recipes join the ranking on the next refresh_recipe_ranking run. The
+    place is annotated as popularity for keyset cursors to page on.
+    """
+    def filter_queryset(self, request, queryset, view):
+        if not is_popular_ordering(request):
+            return queryset
+        return queryset.filter(ranking__isnull=False).annotate(
+            popularity=F('ranking__position')
+        ).order_by(*POPULARITY_ORDERING)
+
+
+def get_search_term(request):
+    return request.query_params.get(RECIPE_SEARCH_PARAM, '').strip()
+
+
+class RecipeSearchFilter(BaseFilterBackend):
+    """?search= over titles and descriptions, most relevant first.
+
+    Goes after RecipeOrderingFilter: relevance replaces any other ordering.
+    """
+    def filter_queryset(self, request, queryset, view):
+        term = get_search_term(request)
+        if not term:
+            return queryset
+        return search_recipes(queryset, term).order_by(*RELEVANCE_ORDERING)
+
+
+class IngredientSearchFilter(BaseFilterBackend):
+    """Prefix matches go first, then substring ones, capped by the limit.
+
+    Postgres answers from the trigram index over UPPER(name). Other backends
+    (SQLite) cannot fold Cyrillic case, so names are matched in Python.
+    """
+    search_param = api_settings.SEARCH_PARAM
+    limit = INGREDIENT_SEARCH_LIMIT
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '').strip()
+        if not term or view.action != 'list':
+            return queryset
+        if connection.vendor == 'postgresql':
+            return self.search_database(queryset, term)
+        return self.search_in_memory(queryset, term)
+
+    def search_database(self, queryset, term):
+        return queryset.filter(name__icontains=term).annotate(
+            match=Case(
+                When(name__istartswith=term, then=PREFIX_MATCH),
+                default=SUBSTRING_MATCH,
+                output_field=IntegerField(),
+            )
+        ).order_by('match', 'name')[:self.limit]
+
+    def search_in_memory(self, queryset, term):
+        term = term.casefold()
+        matches = []
+        for ingredient in queryset.iterator():
+            position = ingredient.name.casefold().find(term)
+            if position != -1:
+                matches.append((
+                    PREFIX_MATCH if position == 0 else SUBSTRING_MATCH,
+                    ingredient.name,
+                    ingredient
+                ))
+        matches.sort(key=lambda match: match[:2])
+        return [ingredient for *_, ingredient in matches[:self.limit]]
@@ -0,0 +1,173 @@
+import json
+import platform
+import random
+import subprocess
+from io import StringIO
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.benchmarking import (benchmark_database, measure, percentile,
+                              seed_bundled_ingredients, seed_favorites,
+                              seed_follows, seed_recipes, seed_shopping_lists,
+                              seed_tags, seed_users, tag_recipes)
+from recipes.models import Recipe
+from recipes.search import update_search_vectors
+
+SEED = 20230307
+SEARCH_TERMS = ('с', 'мо', 'кар', 'сыр', 'масло', 'перец черный')
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', 'HEAD'),
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        ).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Sequential requests through the whole Django stack, middleware and
+    token authentication included, so throughput is that of one worker.
+
+    Compare commits with the same options and database:
+
+    python manage.py benchmark_api --output before.json
+    """
+    help = ('Seeds a synthetic dataset on a throwaway test database and '
+            'reports p50/p99 latency, throughput and queries of the hot '
+            'API endpoints as JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--recipes', type=int, default=5000)
+        parser.add_argument('--tags', type=int, default=8)
+        parser.add_argument('--follows', type=int, default=10)
+        parser.add_argument('--favorites', type=int, default=20)
+        parser.add_argument('--cart', type=int, default=5)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--output', help='File for the report.')
+
+    def handle(self, *args, **options):
+        random.seed(SEED)
+        with benchmark_database():
+            scale = self.seed(options)
+            endpoints = {
+                name: self.run(case, scale['tokens'], options)
+                for name, case in self.get_cases(scale).items()
+            }
+            database = connection.vendor
+        report = json.dumps({
+            'commit': git_commit(),
+            'database': database,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'scale': {
+                key: options[key] for key in (
+                    'users', 'recipes', 'tags', 'follows', 'favorites',
+                    'cart', 'requests', 'warmup'
+                )
+            },
+            'endpoints': endpoints,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(report)
+        self.stdout.write(report)
+
+    def seed(self, options):
+        users = seed_users(options['users'])
+        ingredients = seed_bundled_ingredients()
+        tags = seed_tags(options['tags'])
+        recipes = seed_recipes(users, ingredients, options['recipes'])
+        tag_recipes(recipes, tags)
+        seed_follows(users, options['follows'])
+        seed_favorites(users, recipes, options['favorites'])
+        seed_shopping_lists(users, recipes, options['cart'])
+        call_command('recalculate_counters', stdout=StringIO())
+        call_command('refresh_recipe_ranking', stdout=StringIO())
+        update_search_vectors(Recipe.objects.all())
+        return {
+            'users': users,
+            'recipes': [recipe.pk for recipe in recipes],
+            'tags': [tag.slug for tag in tags],
+            'tokens': [
+                Token.objects.create(user=user).key for user in users
+            ],
+        }
+
+    def get_cases(self, scale):
+        """Name: (needs a token, url maker) for every endpoint measured."""
+        tags = scale['tags']
+        recipes = scale['recipes']
+        authors = scale['users']
+        return {
+            'recipe list': (False, lambda: (
+                f'/api/recipes/?page={random.randint(1, 20)}&limit=6'
+            )),
+            'recipe list, filtered': (True, lambda: (
+                f'/api/recipes/?limit=6&tags={random.choice(tags)}'
+                f'&tags={random.choice(tags)}&is_favorited=1'
+            )),
+            'recipe list, by author': (True, lambda: (
+                f'/api/recipes/?limit=6&author={random.choice(authors).pk}'
+            )),
+            'recipe list, popular': (True, lambda: (
+                f'/api/recipes/?ordering=popular&page={random.randint(1, 20)}'
+                f'&limit=6'
+            )),
+            'recipe search': (False, lambda: (
+                f'/api/recipes/?limit=6&search=bench {random.randint(1, 99)}'
+            )),
+            'recipe detail': (True, lambda: (
+                f'/api/recipes/{random.choice(recipes)}/'
+            )),
+            'ingredient search': (False, lambda: (
+                f'/api/ingredients/?name={random.choice(SEARCH_TERMS)}'
+            )),
+            'subscriptions': (True, lambda: (
+                '/api/users/subscriptions/?limit=6&recipes_limit=3'
+            )),
+            'shopping cart download': (True, lambda: (
+                '/api/recipes/download_shopping_cart/'
+            )),
+        }
+
+    def run(self, case, tokens, options):
+        authenticated, make_url = case
+        client = APIClient()
+        timings = []
+        queries = errors = 0
+        for number in range(options['warmup'] + options['requests']):
+            if authenticated:
+                client.credentials(
+                    HTTP_AUTHORIZATION=f'Token {random.choice(tokens)}'
+                )
+            url = make_url()
+            with measure() as result:
+                response = client.get(url)
+            if number < options['warmup']:
+                continue
+            timings.append(result['seconds'])
+            queries += result['queries']
+            errors += response.status_code >= 400
+        return {
+            'requests': len(timings),
+            'errors': errors,
+            'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+            'throughput_rps': round(len(timings) / sum(timings), 1),
+            'queries_per_request': round(queries / len(timings), 2),
+        }
@@ -0,0 +1,73 @@
+import sys
+from io import BytesIO
+from time import perf_counter
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.signals import connection_created
+from rest_framework.authtoken.models import Token
+
+from api.benchmarking import (benchmark_database, percentile,
+                              seed_ingredients, seed_recipes, seed_users)
+
+PERSISTENT = 600
+
+
+def start_response(status, headers, exc_info=None):
+    return None
+
+
+class Command(BaseCommand):
+    """Requests go through the WSGI handler, so request_finished closes or
+    keeps the connection exactly as under gunicorn. SQLite test databases
+    live in memory and are never reopened; run it against Postgres
+    (DB_ENGINE=django.db.backends.postgresql or fg.db.pooled)."""
+    help = ('Measures the recipe list with a connection per request and '
+            'with a persistent one.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        handler = WSGIHandler()
+        opened = []
+        connection_created.connect(
+            lambda **kwargs: opened.append(1), weak=False
+        )
+        with benchmark_database():
+            users = seed_users(10)
+            seed_recipes(users, seed_ingredients(20), 200)
+            key = Token.objects.create(user=users[0]).key
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': '/api/recipes/',
+                'QUERY_STRING': 'limit=6',
+                'HTTP_AUTHORIZATION': f'Token {key}',
+                'SERVER_NAME': 'testserver',
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'wsgi.url_scheme': 'http',
+                'wsgi.errors': sys.stderr,
+            }
+            self.stdout.write(f'{connection.vendor}, {options["requests"]} '
+                              f'requests to /api/recipes/?limit=6')
+            for label, age in (('per request', 0), ('persistent', PERSISTENT)):
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = age
+                opened.clear()
+                timings = []
+                for _ in range(options['requests']):
+                    start = perf_counter()
+                    response = handler(
+                        {**environ, 'wsgi.input': BytesIO()}, start_response
+                    )
+                    b''.join(response)
+                    response.close()
+                    timings.append(perf_counter() - start)
+                self.stdout.write(
+                    f'{label:<12} {len(opened)} connections opened, '
+                    f'p50 {percentile(timings, 0.5) * 1000:.2f} ms, '
+                    f'p99 {percentile(timings, 0.99) * 1000:.2f} ms, '
+                    f'{len(timings) / sum(timings):.0f} requests/s'
+                )
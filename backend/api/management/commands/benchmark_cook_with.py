@@ -0,0 +1,85 @@
+import random
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Q
+
+from api.benchmarking import (benchmark_database, measure, percentile,
+                              seed_bundled_ingredients, seed_recipes,
+                              seed_users)
+from recipes.inverted_index import RecipeIndex
+from recipes.models import Recipe
+
+PAGE_SIZE = 6
+
+
+def rank_in_database(ingredients):
+    """The GROUP BY over recipe compositions the index replaces."""
+    return list(Recipe.objects.annotate(
+        total=Count('ingredients'),
+        covered=Count(
+            'ingredients',
+            filter=Q(ingredients__ingredient__in=ingredients)
+        ),
+    ).filter(covered__gt=0).order_by(
+        F('total') - F('covered'), '-covered', '-id'
+    ).values_list('id', 'covered')[:PAGE_SIZE])
+
+
+class Command(BaseCommand):
+    help = ('Compares ranking recipes by the ingredients at hand with '
+            'a GROUP BY query and with the in-memory RecipeIndex.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=100000)
+        parser.add_argument('--per-recipe', type=int, default=8)
+        parser.add_argument('--pantry', type=int, default=10)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        generator = random.Random(options['seed'])
+        with benchmark_database():
+            ingredients = seed_bundled_ingredients()
+            seed_recipes(
+                seed_users(100),
+                ingredients,
+                options['recipes'],
+                per_recipe=options['per_recipe']
+            )
+            pantries = [
+                [ingredient.pk for ingredient in generator.sample(
+                    ingredients, options['pantry']
+                )]
+                for _ in range(options['queries'])
+            ]
+            index = RecipeIndex()
+            start = perf_counter()
+            index.load()
+            self.stdout.write(
+                f'index of {options["recipes"]} recipes built in '
+                f'{(perf_counter() - start) * 1000:.0f} ms'
+            )
+            for label, rank in (
+                ('group by', rank_in_database),
+                ('inverted index',
+                 lambda pantry: index.cook_with(pantry)[:PAGE_SIZE]),
+            ):
+                timings = []
+                for pantry in pantries:
+                    with measure() as result:
+                        rank(pantry)
+                    timings.append(result['seconds'])
+                self.stdout.write(
+                    f'{label:<15} first page in '
+                    f'p50 {percentile(timings, 0.5) * 1000:.2f} ms, '
+                    f'p99 {percentile(timings, 0.99) * 1000:.2f} ms'
+                )
+            for pantry in pantries:
+                expected = rank_in_database(pantry)
+                found = [
+                    (recipe, covered)
+                    for recipe, covered, missing in index.cook_with(pantry)
+                ][:PAGE_SIZE]
+                if expected != found:
+                    self.stderr.write(f'Rankings differ for {pantry}')
@@ -0,0 +1,46 @@
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from api.exporters import EXPORTERS
+from api.pdf import render_shopping_list
+from recipes.models import Ingredient
+
+
+class Command(BaseCommand):
+    help = 'Measures render time of every shopping list export format.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        units = [unit for _, unit in Ingredient.UNIT_CHOICES]
+        rows = [
+            {
+                'id': i,
+                'name': f'ингредиент {i}',
+                'measurement_unit': units[i % len(units)],
+                'amount': i % 800 + 1,
+            }
+            for i in range(options['rows'])
+        ]
+        cases = [
+            (exporter.format, exporter().export) for exporter in EXPORTERS
+        ]
+        cases.append((
+            'pdf, uncached',
+            lambda rows: render_shopping_list(rows, use_cache=False)
+        ))
+        for name, export in cases:
+            timings = []
+            for _ in range(options['repeat']):
+                start = perf_counter()
+                document = export(rows)
+                timings.append(perf_counter() - start)
+            self.stdout.write(
+                f'{name:<14} median {median(timings) * 1000:8.3f} ms, '
+                f'max {max(timings) * 1000:8.3f} ms, '
+                f'{len(document)} bytes'
+            )
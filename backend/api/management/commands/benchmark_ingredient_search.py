@@ -0,0 +1,45 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from api.benchmarking import (benchmark_database, measure, percentile,
+                              seed_bundled_ingredients)
+
+
+class Command(BaseCommand):
+    help = ('Compares ingredient autocomplete latency of the in-process '
+            'catalogue against the ORM search on a throwaway test database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        randomizer = random.Random(options['seed'])
+        with benchmark_database():
+            names = [
+                ingredient.name for ingredient in seed_bundled_ingredients()
+            ]
+            terms = []
+            for _ in range(options['requests']):
+                name = randomizer.choice(names)
+                terms.append(name[:randomizer.randint(1, 4)])
+            client = APIClient()
+            for label, enabled in (('orm', False), ('catalogue', True)):
+                with override_settings(INGREDIENT_CATALOGUE_ENABLED=enabled):
+                    client.get('/api/ingredients/', {'name': terms[0]})
+                    timings = []
+                    queries = 0
+                    for term in terms:
+                        with measure() as result:
+                            client.get('/api/ingredients/', {'name': term})
+                        timings.append(result['seconds'])
+                        queries += result['queries']
+                self.stdout.write(
+                    f'{label:<10} '
+                    f'p50 {percentile(timings, 0.5) * 1000:7.3f} ms, '
+                    f'p99 {percentile(timings, 0.99) * 1000:7.3f} ms, '
+                    f'{queries / len(terms):.1f} queries per request'
+                )
@@ -0,0 +1,62 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.benchmarking import (benchmark_database, measure, seed_ingredients,
+                              seed_recipes, seed_tags, seed_users,
+                              tag_recipes)
+from api.filters import RecipeFilter
+from recipes.models import Recipe
+
+PAGE_SIZE = 6
+
+
+class Command(BaseCommand):
+    help = ('Compares tag filtering by JOIN + DISTINCT with the subquery '
+            'filter of RecipeFilter on a throwaway test database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=100000)
+        parser.add_argument('--tags', type=int, default=8)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--explain', action='store_true')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            authors = seed_users(100)
+            ingredients = seed_ingredients(10)
+            tags = seed_tags(options['tags'])
+            recipes = seed_recipes(
+                authors,
+                ingredients,
+                options['recipes'],
+                per_recipe=0
+            )
+            tag_recipes(recipes, tags)
+            slugs = [tag.slug for tag in tags[:2]]
+            request = Request(
+                APIRequestFactory().get('/api/recipes/', {'tags': slugs})
+            )
+            request.user = AnonymousUser()
+            cases = (
+                ('join + distinct',
+                 Recipe.objects.filter(tags__slug__in=slugs).distinct()),
+                ('in subquery',
+                 RecipeFilter().filter_queryset(
+                     request, Recipe.objects.all(), None
+                 )),
+            )
+            for label, queryset in cases:
+                timings = []
+                for _ in range(options['repeat']):
+                    with measure() as result:
+                        total = queryset.count()
+                        list(queryset[:PAGE_SIZE])
+                    timings.append(result['seconds'])
+                self.stdout.write(
+                    f'{label:<16} {total} recipes, first page + count in '
+                    f'{min(timings) * 1000:.1f} ms (best of {len(timings)})'
+                )
+                if options['explain']:
+                    self.stdout.write(queryset[:PAGE_SIZE].explain())
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from api.benchmarking import (benchmark_database, measure, seed_ingredients,
+                              seed_recipes, seed_users)
+from shopping.models import ShoppingList
+
+
+class Command(BaseCommand):
+    help = ('Measures ShoppingList.calculate_ingredients for growing carts '
+            'on a throwaway test database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[1, 10, 50, 100],
+            help='Numbers of recipes in the cart.',
+        )
+        parser.add_argument('--per-recipe', type=int, default=10)
+
+    def handle(self, *args, **options):
+        sizes = sorted(options['sizes'])
+        with benchmark_database():
+            author, = seed_users(1, prefix='author')
+            ingredients = seed_ingredients(200)
+            recipes = seed_recipes(
+                [author],
+                ingredients,
+                sizes[-1],
+                per_recipe=options['per_recipe'],
+            )
+            owners = seed_users(len(sizes), prefix='owner')
+            query_counts = set()
+            for owner, size in zip(owners, sizes):
+                shopping_list = ShoppingList.objects.create(owner=owner)
+                shopping_list.recipes.set(recipes[:size])
+                with measure() as result:
+                    rows = shopping_list.calculate_ingredients()
+                query_counts.add(result['queries'])
+                self.stdout.write(
+                    f'{size:>5} recipes: {len(rows):>4} rows, '
+                    f'{result["queries"]} queries, '
+                    f'{result["seconds"] * 1000:.1f} ms'
+                )
+        if len(query_counts) == 1:
+            self.stdout.write(self.style.SUCCESS(
+                'Query count does not depend on the cart size.'
+            ))
+        else:
+            self.stdout.write(self.style.ERROR(
+                f'Query count varies with the cart size: {query_counts}'
+            ))
@@ -0,0 +1,49 @@
+import random
+
+from django.core.management.base import BaseCommand
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.authentication import CachedTokenAuthentication, token_cache
+from api.benchmarking import (benchmark_database, measure, percentile,
+                              seed_users)
+
+
+class Command(BaseCommand):
+    help = ('Compares queries and time per authenticated request of DRF '
+            'TokenAuthentication and CachedTokenAuthentication.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        with benchmark_database():
+            keys = [
+                Token.objects.create(user=user).key
+                for user in seed_users(options['users'])
+            ]
+            requests = [
+                factory.get(
+                    '/api/users/me/', HTTP_AUTHORIZATION=f'Token {key}'
+                )
+                for key in random.choices(keys, k=options['requests'])
+            ]
+            token_cache.clear()
+            for backend in (TokenAuthentication, CachedTokenAuthentication):
+                timings = []
+                queries = 0
+                for request in requests:
+                    with measure() as result:
+                        backend().authenticate(Request(request))
+                    timings.append(result['seconds'])
+                    queries += result['queries']
+                self.stdout.write(
+                    f'{backend.__name__:<27} '
+                    f'{queries / len(requests):.3f} queries/request, '
+                    f'p50 {percentile(timings, 0.5) * 1e6:.0f} µs, '
+                    f'p99 {percentile(timings, 0.99) * 1e6:.0f} µs'
+                )
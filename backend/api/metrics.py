@@ -0,0 +1,155 @@
+"""Request histograms kept in process, exposed in the Prometheus text format.
+
+Every worker process counts only the requests it served, so a scrape through
+a load balancer sees one worker at a time. Label series by instance, or
+scrape the workers directly, to aggregate them.
+"""
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+LABELS = ('view', 'method')
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+OTHER_METHOD = 'OTHER'
+SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+BYTES_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304
+)
+
+
+def escape(value):
+    return (str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def format_bound(bound):
+    return f'{bound:g}'
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        """Counts go to the first bucket whose bound is >= value."""
+        with self.lock:
+            counts, total = self.series.get(
+                labels, ([0] * (len(self.buckets) + 1), 0)
+            )
+            counts[bisect_left(self.buckets, value)] += 1
+            self.series[labels] = counts, total + value
+
+    def expose(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self.lock:
+            series = sorted(
+                (labels, list(counts), total)
+                for labels, (counts, total) in self.series.items()
+            )
+        bounds = [format_bound(bound) for bound in self.buckets] + ['+Inf']
+        for labels, counts, total in series:
+            label_text = ','.join(
+                f'{name}="{escape(value)}"'
+                for name, value in zip(LABELS, labels)
+            )
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{bound}"}} '
+                    f'{cumulative}'
+                )
+            lines.append(f'{self.name}_sum{{{label_text}}} {total:g}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return '\n'.join(lines)
+
+
+REQUEST_SECONDS = Histogram(
+    'api_request_duration_seconds',
+    'Wall time of the whole request.',
+    SECONDS_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    'api_request_db_seconds',
+    'Time spent executing SQL.',
+    SECONDS_BUCKETS,
+)
+QUERIES = Histogram(
+    'api_request_queries',
+    'Number of SQL queries.',
+    QUERY_BUCKETS,
+)
+SERIALIZE_SECONDS = Histogram(
+    'api_request_serialize_seconds',
+    'Time spent building response data in serializers.',
+    SECONDS_BUCKETS,
+)
+RENDER_SECONDS = Histogram(
+    'api_request_render_seconds',
+    'Time spent rendering the response body, e.g. JSON encoding.',
+    SECONDS_BUCKETS,
+)
+RESPONSE_BYTES = Histogram(
+    'api_response_size_bytes',
+    'Size of the response body.',
+    BYTES_BUCKETS,
+)
+HISTOGRAMS = (
+    REQUEST_SECONDS, DB_SECONDS, QUERIES, SERIALIZE_SECONDS, RENDER_SECONDS,
+    RESPONSE_BYTES
+)
+
+
+def method_label(method):
+    """Arbitrary verbs would make series without bound."""
+    return method if method in METHODS else OTHER_METHOD
+
+
+@contextmanager
+def serializing(request):
+    """Add the block's wall time to request.serialize_seconds.
+
+    Serializers nested in the one being timed are not counted twice.
+    Requests the middleware has not seen are not timed at all.
+    """
+    request = getattr(request, '_request', request)
+    if getattr(request, 'serializing', True):
+        yield
+        return
+    request.serializing = True
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        request.serializing = False
+        request.serialize_seconds += perf_counter() - start
+
+
+def expose():
+    return '\n'.join(histogram.expose() for histogram in HISTOGRAMS) + '\n'
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.exception:
+            response['Content-Type'] = JSONRenderer.media_type
+            return JSONRenderer().render(data)
+        return data.encode(self.charset)
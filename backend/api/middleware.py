@@ -0,0 +1,95 @@
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from api import metrics
+
+logger = logging.getLogger(__name__)
+UNRESOLVED_VIEW = 'unresolved'
+SLOW_REQUEST_MESSAGE = (
+    'Slow request %s %s (%s): %.0f ms, %d queries in %.0f ms, '
+    'serialized in %.0f ms, rendered in %.0f ms, %d bytes'
+)
+
+
+class QueryTimer:
+    """connection.execute_wrapper counting queries and their time."""
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += perf_counter() - start
+
+
+class RequestMetricsMiddleware:
+    """Times SQL, serialization, rendering and the whole request.
+
+    Observations feed the histograms of api.metrics. With SERVER_TIMING on
+    they also go back to the browser as a Server-Timing header, and
+    requests slower than SLOW_REQUEST_THRESHOLD seconds are logged.
+    Serialization is the time spent in serializers' to_representation
+    (api.metrics.serializing). Rendering starts at process_template_response,
+    i.e. right after a DRF view has returned its data, so render covers the
+    renderer only.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        request.render_started = None
+        request.serializing = False
+        request.serialize_seconds = 0.0
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        total = perf_counter() - start
+        render = (
+            perf_counter() - request.render_started
+            if request.render_started is not None else 0.0
+        )
+        size = 0 if response.streaming else len(response.content)
+        match = request.resolver_match
+        labels = (match.view_name if match else UNRESOLVED_VIEW,
+                  metrics.method_label(request.method))
+        serialize = request.serialize_seconds
+        metrics.REQUEST_SECONDS.observe(labels, total)
+        metrics.DB_SECONDS.observe(labels, timer.seconds)
+        metrics.QUERIES.observe(labels, timer.queries)
+        metrics.SERIALIZE_SECONDS.observe(labels, serialize)
+        metrics.RENDER_SECONDS.observe(labels, render)
+        metrics.RESPONSE_BYTES.observe(labels, size)
+        if settings.SERVER_TIMING:
+            # Lazy queries run by serializers count in both db and serialize
+            app = max(total - timer.seconds - serialize - render, 0.0)
+            response['Server-Timing'] = (
+                f'db;dur={timer.seconds * 1000:.1f};'
+                f'desc="{timer.queries} queries", '
+                f'serialize;dur={serialize * 1000:.1f}, '
+                f'app;dur={app * 1000:.1f}, '
+                f'render;dur={render * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}'
+            )
+        threshold = settings.SLOW_REQUEST_THRESHOLD
+        if threshold and total >= threshold:
+            logger.warning(
+                SLOW_REQUEST_MESSAGE, request.method, request.path, labels[0],
+                total * 1000, timer.queries, timer.seconds * 1000,
+                serialize * 1000, render * 1000, size
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        request.render_started = perf_counter()
+        return response
@@ -1,5 +1,157 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as DecodingError
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+EXACT_COUNT = 'exact'
+APPROXIMATE_COUNT = 'approximate'
+
+
+def approximate_count(queryset):
+    """Planner's row estimate on Postgres, a real COUNT(*) elsewhere."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        # psycopg2 decodes the json column into Python objects
+        plan = cursor.fetchone()[0]
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_ordering_field(queryset, name):
+    """Model field or annotation the queryset can be ordered by."""
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    return queryset.model._meta.get_field(name)
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pages over the view's cursor_ordering, e.g. (-pub_date, -id).
+
+    The cursor holds the ordering values of the last row served, so the
+    next page is an index range scan instead of an OFFSET over everything
+    before it. The total is skipped unless ?count=exact or
+    ?count=approximate asks for it.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    count_query_param = 'count'
+    page_size = 6
+    max_page_size = 100
+    ordering = ('-pub_date', '-id')
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = getattr(view, 'cursor_ordering', self.ordering)
+        self.page_size = self.get_page_size(request)
+        self.count = self.get_count(queryset, request)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(
+                self.get_position_filter(queryset, cursor)
+            )
+        page = list(queryset[:self.page_size + 1])
+        self.next_position = None
+        if len(page) > self.page_size:
+            page = page[:self.page_size]
+            self.next_position = [
+                getattr(page[-1], field.lstrip('-'))
+                for field in self.ordering
+            ]
+        return page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == EXACT_COUNT:
+            return queryset.count()
+        if mode == APPROXIMATE_COUNT:
+            return approximate_count(queryset)
+        return None
+
+    def get_position_filter(self, queryset, cursor):
+        """Rows strictly after the cursor in lexicographic ordering."""
+        try:
+            values = json.loads(urlsafe_b64decode(cursor.encode()))
+            fields = [field.lstrip('-') for field in self.ordering]
+            values = [
+                get_ordering_field(queryset, field).to_python(value)
+                for field, value in zip(fields, values)
+            ]
+        except (DecodingError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        position = Q()
+        for index, field in enumerate(self.ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{fields[index]}__{lookup}': values[index]})
+            for equal_field, value in zip(fields[:index], values):
+                step &= Q(**{equal_field: value})
+            position |= step
+        return position
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        cursor = urlsafe_b64encode(json.dumps(
+            [str(value) for value in self.next_position]
+        ).encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            cursor
+        )
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['results'] = data
+        return Response(payload)
 
 
 class FlexiblePagination(PageNumberPagination):
+    """Page numbers by default, keyset pages on ?pagination=cursor."""
+    page_size_query_param = 'limit'
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (request.query_params.get(self.mode_query_param)
+                == self.cursor_mode):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class RankedListPagination(PageNumberPagination):
+    """Page numbers over an already ranked list, e.g. "cook with" matches."""
+    page_size = 6
     page_size_query_param = 'limit'
+    max_page_size = 100
@@ -0,0 +1,79 @@
+"""Shopping list rendering to PDF."""
+import json
+import os
+from hashlib import sha256
+from io import BytesIO
+
+from django.core.cache import cache
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+FONT_NAME = 'FreeSans'
+FONT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'static', 'fonts', 'FreeSans.ttf'
+)
+HORIZONTAL_OFFSET = 1
+VERTICAL_OFFSET = 11
+BOTTOM_OFFSET = 1
+DOT_OFFSET = 100
+HEADER_FONT_SIZE = 18
+BODY_FONT_SIZE = 12
+SHOPPING_STRING = '{name}{offset}{amount} {unit}'
+CACHE_KEY = 'shopping-list-pdf:{digest}'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def register_fonts():
+    """Parse the TTF once per process, reportlab keeps it globally."""
+    if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(FONT_NAME, FONT_PATH))
+
+
+def render_shopping_list(rows, use_cache=True):
+    """Get PDF bytes for calculate_ingredients() rows, cached by content."""
+    if not use_cache:
+        return _render(rows)
+    digest = sha256(
+        json.dumps(rows, ensure_ascii=False, sort_keys=True).encode()
+    ).hexdigest()
+    key = CACHE_KEY.format(digest=digest)
+    document = cache.get(key)
+    if document is None:
+        document = _render(rows)
+        cache.set(key, document, CACHE_TIMEOUT)
+    return document
+
+
+def _begin_page(pdf):
+    text = pdf.beginText()
+    text.setTextOrigin(HORIZONTAL_OFFSET * inch, VERTICAL_OFFSET * inch)
+    text.setFont(FONT_NAME, BODY_FONT_SIZE)
+    return text
+
+
+def _render(rows):
+    register_fonts()
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    text = _begin_page(pdf)
+    text.setFont('Helvetica', HEADER_FONT_SIZE)
+    text.textLine('FOODGRAM')
+    text.setFont(FONT_NAME, BODY_FONT_SIZE)
+    for row in rows:
+        if text.getY() < BOTTOM_OFFSET * inch:
+            pdf.drawText(text)
+            pdf.showPage()
+            text = _begin_page(pdf)
+        text.textLine(SHOPPING_STRING.format(
+            name=row['name'].capitalize(),
+            offset='.' * (DOT_OFFSET - len(row['name'])),
+            amount=row['amount'],
+            unit=row['measurement_unit']
+        ))
+    pdf.drawText(text)
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+from fg.db.routers import read_from_replicas
+
+PIN_KEY = 'primary-pin:{user_id}'
+
+
+class ReplicaReadMixin:
+    """Safe requests read from DATABASE_REPLICAS after authentication.
+
+    A successful write pins its author to the primary for
+    REPLICA_PIN_SECONDS, so the reads right after it see the change however
+    far the replicas lag. Authentication itself stays on the primary: a
+    token issued a moment ago may not have been replicated yet.
+    """
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (settings.DATABASE_REPLICAS and request.method in SAFE_METHODS
+                and not self.is_pinned(request)):
+            read_from_replicas(True)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Not in finalize_response: a non-API exception skips it and
+            # would leave the thread reading from replicas for good
+            read_from_replicas(False)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (settings.DATABASE_REPLICAS
+                and request.method not in SAFE_METHODS
+                and response.status_code < 400
+                and request.user.is_authenticated):
+            cache.set(
+                PIN_KEY.format(user_id=request.user.pk),
+                True,
+                settings.REPLICA_PIN_SECONDS,
+            )
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def is_pinned(self, request):
+        return request.user.is_authenticated and cache.get(
+            PIN_KEY.format(user_id=request.user.pk), False
+        )
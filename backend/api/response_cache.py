@@ -0,0 +1,56 @@
+from hashlib import sha256
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from api.versions import get_versions
+
+RESPONSE_KEY = 'response:{versions}:{digest}'
+
+
+class AnonymousResponseCacheMixin:
+    """Reuse serialized list/retrieve data of anonymous requests.
+
+    Anonymous users see no per-user flags, so the data depends on the query
+    string only. Keys embed the versions of cache_scopes, so every change
+    there moves readers to fresh keys and the old ones simply expire.
+    The URL is hashed into the key: memcached refuses keys over 250
+    characters, which long or percent-encoded queries easily exceed.
+    """
+    cached_actions = ('list', 'retrieve')
+    cache_scopes = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+    def get_response_cache_key(self, request):
+        query = urlencode(sorted(
+            (param, value)
+            for param, values in request.query_params.lists()
+            for value in values
+        ))
+        # Scheme too: payloads hold absolute URLs of build_absolute_uri
+        url = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+        return RESPONSE_KEY.format(
+            versions=':'.join(map(repr, get_versions(*self.cache_scopes))),
+            digest=sha256(url.encode()).hexdigest(),
+        )
+
+    def cached(self, handler, request, *args, **kwargs):
+        if (self.action not in self.cached_actions
+                or request.user.is_authenticated):
+            return handler(request, *args, **kwargs)
+        cache = caches[settings.RESPONSE_CACHE_ALIAS]
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
@@ -1,10 +1,18 @@
 from base64 import b64decode
+from binascii import Error as DecodingError
 from datetime import timedelta
+from tempfile import SpooledTemporaryFile
 
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
+from api import metrics
+from api.versions import RECIPES, bump_versions
+from recipes.images import rendition_urls, schedule_renditions
+from recipes.inverted_index import recipe_index
 from recipes.models import (Favorite, Ingredient, IngredientPerRecipe,
                             Recipe, Tag)
 from shopping.models import ShoppingList
@@ -36,18 +44,59 @@ class DurationNormalizer(serializers.Field):
 
 
 class ImageDecoder(serializers.ImageField):
-    """Base64 string decoding."""
+    """Base64 string decoding, chunk by chunk, into a spooled temp file."""
+    CHUNK = 64 * 1024  # multiple of 4 to keep base64 quanta whole
+
     def to_internal_value(self, data):
-        format, imgstr = data.split(';base64,')
-        return super().to_internal_value(
-            ContentFile(
-                b64decode(imgstr),
-                name=f'temp.{format.split("/")[-1]}'
+        try:
+            format, imgstr = data.split(';base64,')
+        except (AttributeError, ValueError):
+            raise serializers.ValidationError(
+                'Ожидается изображение в формате data:<тип>;base64,<данные>.'
             )
+        if len(imgstr) // 4 * 3 > settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                'Размер изображения не может превышать '
+                f'{settings.IMAGE_UPLOAD_MAX_SIZE // 2 ** 20} МБ.'
+            )
+        buffer = SpooledTemporaryFile(max_size=self.CHUNK)
+        try:
+            for start in range(0, len(imgstr), self.CHUNK):
+                buffer.write(b64decode(
+                    imgstr[start:start + self.CHUNK],
+                    validate=True
+                ))
+        except DecodingError:
+            raise serializers.ValidationError('Некорректные данные base64.')
+        buffer.seek(0)
+        return super().to_internal_value(
+            File(buffer, name=f'temp.{format.split("/")[-1]}')
         )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class ImageRenditionsField(serializers.ReadOnlyField):
+    """Absolute URLs of the recipes.images renditions of the recipe photo."""
+    def __init__(self, **kwargs):
+        super().__init__(source='*', **kwargs)
+
+    def to_representation(self, recipe):
+        request = self.context.get('request')
+        return {
+            rendition: (request.build_absolute_uri(url) if request else url)
+            for rendition, url in rendition_urls(
+                recipe.image, recipe.has_renditions
+            ).items()
+        }
+
+
+class TimedModelSerializer(serializers.ModelSerializer):
+    """Time of building response data goes to the request metrics."""
+    def to_representation(self, instance):
+        with metrics.serializing(self.context.get('request')):
+            return super().to_representation(instance)
+
+
+class UserSerializer(TimedModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
     username = serializers.CharField(
         required=True,
@@ -74,6 +123,8 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'subscribed'):
+            return obj.subscribed
         user = self.context['request'].user
         return (not user.is_anonymous and Follow.objects.filter(
             user=user,
@@ -81,7 +132,7 @@ class UserSerializer(serializers.ModelSerializer):
         ).exists())
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedModelSerializer):
     color = ColorNormalizer()
 
     class Meta:
@@ -89,7 +140,7 @@ class TagSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(TimedModelSerializer):
     measurement_unit = serializers.CharField(
         source='get_unit_display',
         read_only=True
@@ -100,7 +151,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit')
 
 
-class IngredientPerRecipeSerializerSafe(serializers.ModelSerializer):
+class IngredientPerRecipeSerializerSafe(TimedModelSerializer):
     id = serializers.SerializerMethodField()
     measurement_unit = serializers.SerializerMethodField()
     name = serializers.SerializerMethodField()
@@ -119,7 +170,7 @@ class IngredientPerRecipeSerializerSafe(serializers.ModelSerializer):
         return obj.ingredient.name
 
 
-class RecipeSerializerSafe(serializers.ModelSerializer):
+class RecipeSerializerSafe(TimedModelSerializer):
     name = serializers.CharField(source='title', read_only=True)
     text = serializers.CharField(source='description', read_only=True)
     cooking_time = DurationNormalizer()
@@ -128,6 +179,7 @@ class RecipeSerializerSafe(serializers.ModelSerializer):
     ingredients = IngredientPerRecipeSerializerSafe(many=True)
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image_renditions = ImageRenditionsField()
 
     class Meta:
         model = Recipe
@@ -141,10 +193,13 @@ class RecipeSerializerSafe(serializers.ModelSerializer):
             'is_favorited',
             'is_in_shopping_cart',
             'image',
+            'image_renditions',
             'cooking_time'
         )
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'favorited'):
+            return obj.favorited
         user = self.context['request'].user
         return (not user.is_anonymous and Favorite.objects.filter(
             user=user,
@@ -152,6 +207,8 @@ class RecipeSerializerSafe(serializers.ModelSerializer):
         ).exists())
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'in_shopping_cart'):
+            return obj.in_shopping_cart
         user = self.context['request'].user
         return (not user.is_anonymous and ShoppingList.objects.filter(
             owner=self.context['request'].user,
@@ -159,7 +216,7 @@ class RecipeSerializerSafe(serializers.ModelSerializer):
         ).exists())
 
 
-class IngredientPerRecipeSerializerUnsafe(serializers.ModelSerializer):
+class IngredientPerRecipeSerializerUnsafe(TimedModelSerializer):
     id = serializers.PrimaryKeyRelatedField(
         source='ingredient',
         queryset=Ingredient.objects.all()
@@ -170,7 +227,7 @@ class IngredientPerRecipeSerializerUnsafe(serializers.ModelSerializer):
         fields = ('id', 'amount')
 
 
-class RecipeSerializerUnsafe(serializers.ModelSerializer):
+class RecipeSerializerUnsafe(TimedModelSerializer):
     name = serializers.CharField(source='title')
     text = serializers.CharField(source='description')
     cooking_time = DurationNormalizer()
@@ -179,6 +236,11 @@ class RecipeSerializerUnsafe(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     author = UserSerializer(read_only=True)
+    # Declared: DRF makes relations with a through model read-only
+    tags = serializers.PrimaryKeyRelatedField(
+        many=True,
+        queryset=Tag.objects.all()
+    )
 
     class Meta:
         model = Recipe
@@ -187,6 +249,15 @@ class RecipeSerializerUnsafe(serializers.ModelSerializer):
                   'is_favorited', 'is_in_shopping_cart')
         read_only_fields = ('author', 'is_favorited', 'is_in_shopping_cart')
 
+    def validate_ingredients(self, ingredients):
+        ingredient_ids = [spec['ingredient'].pk for spec in ingredients]
+        if len(ingredient_ids) != len(set(ingredient_ids)):
+            raise serializers.ValidationError(
+                'Ингредиенты не должны повторяться.'
+            )
+        return ingredients
+
+    @transaction.atomic
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
@@ -194,39 +265,81 @@ class RecipeSerializerUnsafe(serializers.ModelSerializer):
             **validated_data,
             author=self.context['request'].user
         )
-        composition = []
         # spec's OrderedDict([('ingredient',<Ingredient:рис>),('amount',10.0)])
-        for ingredient_specification in ingredients:
-            composition.append(IngredientPerRecipe(
-                recipe=recipe,
-                **ingredient_specification
-            ))
-        IngredientPerRecipe.objects.bulk_create(composition)
-        for tag in tags:
-            recipe.tags.add(tag)
+        IngredientPerRecipe.objects.bulk_create(
+            IngredientPerRecipe(recipe=recipe, **ingredient_specification)
+            for ingredient_specification in ingredients
+        )
+        recipe.tags.set(tags)
+        schedule_renditions(recipe.image.name)
+        # bulk_create sends no post_save for the index to pick up
+        recipe_index.schedule_refresh(recipe.pk)
         return recipe
 
+    @transaction.atomic
     def update(self, recipe, validated_data):
-        ingredients = validated_data.pop('ingredients')
-        tags = validated_data.pop('tags')
-        recipe.update(**validated_data)
-        old_composition = set(recipe.ingredients)
-        new_composition = set()
-        for ingredient_specification in ingredients:
-            new_composition.add(IngredientPerRecipe(
-                recipe=recipe,
-                **ingredient_specification
-            ))
-        new_ingredients = new_composition.difference(old_composition)
-        outdated_ingredients = old_composition.difference(new_composition)
-        outdated_ingredients.delete()
-        IngredientPerRecipe.objects.bulk_create(new_ingredients)
-        recipe.tags.remove()
-        for tag in tags:
-            recipe.tags.add(tag)
+        ingredients = validated_data.pop('ingredients', None)
+        tags = validated_data.pop('tags', None)
+        for field, value in validated_data.items():
+            setattr(recipe, field, value)
+        # Not a full save: the renditions thread may have set has_renditions
+        # since the recipe was loaded
+        update_fields = list(validated_data)
+        if 'image' in validated_data:
+            recipe.has_renditions = False
+            update_fields.append('has_renditions')
+        recipe.save(update_fields=update_fields)
+        if ingredients is not None:
+            self.update_composition(recipe, ingredients)
+            recipe_index.schedule_refresh(recipe.pk)
+            # Bulk writes send no signals, and the save may have had nothing
+            # to write
+            bump_versions(RECIPES)
+        if tags is not None:
+            recipe.tags.set(tags)
+        if 'image' in validated_data:
+            schedule_renditions(recipe.image.name)
         return recipe
 
+    def update_composition(self, recipe, ingredients):
+        """Diff by ingredient: one bulk delete, create and update at most."""
+        wanted = {
+            specification['ingredient'].pk: specification['amount']
+            for specification in ingredients
+        }
+        current = {
+            composition.ingredient_id: composition
+            for composition in IngredientPerRecipe.objects.filter(
+                recipe=recipe
+            )
+        }
+        outdated = current.keys() - wanted.keys()
+        if outdated:
+            IngredientPerRecipe.objects.filter(
+                recipe=recipe,
+                ingredient_id__in=outdated
+            ).delete()
+        IngredientPerRecipe.objects.bulk_create(
+            IngredientPerRecipe(
+                recipe=recipe,
+                ingredient_id=ingredient_id,
+                amount=amount
+            )
+            for ingredient_id, amount in wanted.items()
+            if ingredient_id not in current
+        )
+        changed = []
+        for ingredient_id, composition in current.items():
+            amount = wanted.get(ingredient_id, composition.amount)
+            if amount != composition.amount:
+                composition.amount = amount
+                changed.append(composition)
+        if changed:
+            IngredientPerRecipe.objects.bulk_update(changed, ('amount',))
+
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'favorited'):
+            return obj.favorited
         user = self.context['request'].user
         return (not user.is_anonymous and Favorite.objects.filter(
             user=user,
@@ -234,6 +347,8 @@ class RecipeSerializerUnsafe(serializers.ModelSerializer):
         ).exists())
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'in_shopping_cart'):
+            return obj.in_shopping_cart
         user = self.context['request'].user
         return (not user.is_anonymous and ShoppingList.objects.filter(
             owner=self.context['request'].user,
@@ -241,21 +356,21 @@ class RecipeSerializerUnsafe(serializers.ModelSerializer):
         ).exists())
 
 
-class RecipeSerializerShort(serializers.ModelSerializer):
+class RecipeSerializerShort(TimedModelSerializer):
     """Used in subscriptions, favorites, and shopping list POST responses."""
     name = serializers.CharField(source='title', read_only=True)
     cooking_time = DurationNormalizer()
+    image_renditions = ImageRenditionsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_renditions', 'cooking_time')
         read_only_fields = ('id', 'name', 'image', 'cooking_time')
 
 
-class UserFollowedSerializer(serializers.ModelSerializer):
+class UserFollowedSerializer(TimedModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
-    recipes = RecipeSerializerShort(many=True)
+    recipes = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -267,17 +382,27 @@ class UserFollowedSerializer(serializers.ModelSerializer):
                             'recipes', 'recipes_count')
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'subscribed'):
+            return obj.subscribed
         user = self.context['request'].user
         return (not user.is_anonymous and Follow.objects.filter(
             user=user,
             author=obj
         ).exists())
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
+    def get_recipes(self, obj):
+        """Prefetched as recipes_preview by UserViewSet.annotate_followed."""
+        recipes = getattr(obj, 'recipes_preview', None)
+        if recipes is None:
+            recipes = obj.recipes.all()
+        return RecipeSerializerShort(
+            recipes,
+            many=True,
+            context=self.context
+        ).data
 
 
-class ChangePasswordSerializer(serializers.ModelSerializer):
+class ChangePasswordSerializer(TimedModelSerializer):
     current_password = serializers.CharField(required=True)
     new_password = serializers.CharField(required=True)
 
@@ -0,0 +1,82 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import token_cache
+from api.versions import (INGREDIENTS, RECIPES, TAGS, bump_versions,
+                          user_scope)
+from recipes.images import renditions_ready
+from recipes.models import (Favorite, Ingredient, IngredientPerRecipe,
+                            Recipe, Tag)
+from shopping.models import ShoppingList
+from users.models import Follow, User
+
+M2M_CHANGES = ('post_add', 'post_remove', 'post_clear')
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_versions(TAGS, RECIPES)
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    bump_versions(INGREDIENTS, RECIPES)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=IngredientPerRecipe)
+def recipe_changed(sender, **kwargs):
+    bump_versions(RECIPES)
+
+
+@receiver(renditions_ready)
+def recipe_image_rendered(sender, **kwargs):
+    bump_versions(RECIPES)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, action, **kwargs):
+    if action in M2M_CHANGES:
+        bump_versions(RECIPES)
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        bump_versions(RECIPES)
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(sender, instance, update_fields=None, **kwargs):
+    """Cached tokens carry a copy of the user, e.g. its is_active."""
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    token_cache.invalidate(*Token.objects.filter(
+        user=instance
+    ).values_list('key', flat=True))
+
+
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+@receiver((post_save, post_delete), sender=Follow)
+def user_relation_changed(sender, instance, **kwargs):
+    bump_versions(user_scope(instance.user_id))
+
+
+@receiver(m2m_changed, sender=ShoppingList.recipes.through)
+def shopping_list_changed(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    if action not in M2M_CHANGES:
+        return
+    if not reverse:
+        bump_versions(user_scope(instance.owner_id))
+        return
+    owners = ShoppingList.objects.filter(pk__in=pk_set or ()).values_list(
+        'owner', flat=True
+    )
+    bump_versions(*(user_scope(owner) for owner in owners))
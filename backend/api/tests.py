@@ -0,0 +1,229 @@
+import warnings
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.benchmarking import (seed_favorites, seed_follows, seed_ingredients,
+                              seed_recipes, seed_shopping_lists, seed_tags,
+                              seed_users, tag_recipes)
+from api.pagination import approximate_count
+from api.serializers import RecipeSerializerUnsafe
+from recipes.models import IngredientPerRecipe, Recipe, Tag
+from recipes.search import update_search_vectors
+
+PAGE_SIZES = (1, 5, 20)
+
+
+class ApproximateCountTests(TestCase):
+    def setUp(self):
+        Tag.objects.bulk_create(
+            Tag(name=f'тэг {i}', slug=f'tag-{i}', color=i) for i in range(3)
+        )
+
+    def test_counts_rows_outside_postgres(self):
+        with mock.patch.object(connection, 'vendor', 'sqlite'):
+            self.assertEqual(approximate_count(Tag.objects.all()), 3)
+
+    def test_reads_decoded_plan(self):
+        """psycopg2 hands the json plan over as Python objects."""
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value.fetchone.return_value = (
+            [{'Plan': {'Node Type': 'Seq Scan', 'Plan Rows': 42}}],
+        )
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            with mock.patch.object(connection, 'cursor', return_value=cursor):
+                self.assertEqual(approximate_count(Tag.objects.all()), 42)
+        sql = cursor.__enter__.return_value.execute.call_args[0][0]
+        self.assertTrue(sql.startswith('EXPLAIN (FORMAT JSON) SELECT'))
+
+    @skipUnless(connection.vendor == 'postgresql', 'planner estimate')
+    def test_planner_estimate(self):
+        self.assertIsInstance(approximate_count(Tag.objects.all()), int)
+
+
+class ListQueryCountTests(TestCase):
+    """Queries per list page must not grow with the rows on it."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_users(12)
+        recipes = seed_recipes(
+            cls.users, seed_ingredients(10), 60, per_recipe=3
+        )
+        tag_recipes(recipes, seed_tags(3))
+        seed_follows(cls.users, per_user=8)
+        seed_favorites(cls.users, recipes)
+        seed_shopping_lists(cls.users, recipes)
+
+    def setUp(self):
+        # Versions and anonymous responses, which would spare queries
+        cache.clear()
+        self.client = APIClient()
+
+    def test_recipes_anonymous(self):
+        for limit in PAGE_SIZES:
+            with self.subTest(limit=limit), self.assertNumQueries(4):
+                response = self.client.get('/api/recipes/', {'limit': limit})
+            self.assertEqual(len(response.data['results']), limit)
+
+    def test_recipes_authenticated(self):
+        self.client.force_authenticate(self.users[0])
+        for limit in PAGE_SIZES:
+            with self.subTest(limit=limit), self.assertNumQueries(5):
+                response = self.client.get('/api/recipes/', {'limit': limit})
+            self.assertEqual(len(response.data['results']), limit)
+
+    def test_subscriptions(self):
+        self.client.force_authenticate(self.users[0])
+        for limit in PAGE_SIZES:
+            for recipes_limit in (1, 5, 10):
+                with self.subTest(limit=limit, recipes_limit=recipes_limit):
+                    with self.assertNumQueries(3):
+                        response = self.client.get(
+                            '/api/users/subscriptions/',
+                            {'limit': limit, 'recipes_limit': recipes_limit}
+                        )
+                    authors = response.data['results']
+                    self.assertEqual(len(authors), min(limit, 8))
+                    self.assertLessEqual(
+                        max(len(author['recipes']) for author in authors),
+                        recipes_limit
+                    )
+
+    def test_subscriptions_anonymous(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/users/subscriptions/')
+        self.assertEqual(response.status_code, 401)
+
+
+class UpdateCompositionTests(TestCase):
+    """Diff-based recipe ingredients update: rows and bounded queries."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredients = seed_ingredients(5)
+        # ingredients 0, 1 and 2 in amounts 1, 2 and 3
+        cls.recipe = seed_recipes(
+            seed_users(1), cls.ingredients, 1, per_recipe=3
+        )[0]
+
+    def assert_updated(self, amounts, queries):
+        """amounts maps indices in self.ingredients to amounts."""
+        with self.assertNumQueries(queries):
+            RecipeSerializerUnsafe().update_composition(self.recipe, [
+                {'ingredient': self.ingredients[index], 'amount': amount}
+                for index, amount in amounts.items()
+            ])
+        self.assertEqual(
+            dict(IngredientPerRecipe.objects.filter(
+                recipe=self.recipe
+            ).values_list('ingredient', 'amount')),
+            {
+                self.ingredients[index].pk: amount
+                for index, amount in amounts.items()
+            }
+        )
+
+    def test_unchanged(self):
+        self.assert_updated({0: 1, 1: 2, 2: 3}, queries=1)
+
+    def test_added(self):
+        self.assert_updated({0: 1, 1: 2, 2: 3, 3: 4}, queries=2)
+
+    def test_removed(self):
+        # delete() fetches the rows first for their post_delete signals
+        self.assert_updated({0: 1}, queries=3)
+
+    def test_changed_amount(self):
+        self.assert_updated({0: 5, 1: 2, 2: 3}, queries=2)
+
+    def test_all_at_once(self):
+        self.assert_updated({0: 5, 1: 2, 3: 4}, queries=5)
+
+
+class QueryParamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_users(1)[0]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_non_decimal_recipes_limit(self):
+        for limit in ('²', '-1', 'x'):
+            with self.subTest(recipes_limit=limit):
+                response = self.client.get(
+                    '/api/users/subscriptions/', {'recipes_limit': limit}
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_non_decimal_filter_values(self):
+        params = (
+            {'author': '²'},
+            {'is_favorited': '²'},
+            {'is_in_shopping_cart': '²'},
+            {'ordering': '²'},
+        )
+        for query in params:
+            with self.subTest(**query):
+                response = self.client.get('/api/recipes/', query)
+                self.assertEqual(response.status_code, 200)
+
+
+class ResponseCacheKeyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = seed_users(2)
+        tag_recipes(
+            seed_recipes(users, seed_ingredients(3), 10), seed_tags(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_long_query(self):
+        query = {'tags': [f'tag-{i}' for i in range(30)], 'search': 'щи' * 20}
+        with warnings.catch_warnings():
+            # Raised as InvalidCacheKey by memcached backends
+            warnings.simplefilter('error', CacheKeyWarning)
+            self.assertEqual(
+                self.client.get('/api/recipes/', query).status_code, 200
+            )
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    self.client.get('/api/recipes/', query).status_code, 200
+                )
+
+    def test_scheme(self):
+        self.client.get('/api/recipes/')
+        response = self.client.get('/api/recipes/', secure=True)
+        self.assertTrue(
+            response.data[0]['image'].startswith('https://')
+        )
+
+
+class SearchCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Same wording, so every match has the same rank
+        seed_recipes(seed_users(1), seed_ingredients(1), 7, per_recipe=1)
+        update_search_vectors(Recipe.objects.all())
+
+    def test_pages_through_equal_ranks(self):
+        client = APIClient()
+        url = '/api/recipes/?search=recipe&pagination=cursor&limit=2'
+        seen = []
+        while url and len(seen) <= 7:
+            response = client.get(url)
+            seen.extend(recipe['id'] for recipe in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(
+            seen, list(Recipe.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            ))
+        )
@@ -1,7 +1,7 @@
 from django.conf.urls import url
 from django.urls import include, path
 from rest_framework import routers
-from api.views import (IngredientViewSet, RecipeViewSet,
+from api.views import (IngredientViewSet, MetricsView, RecipeViewSet,
                        TagViewSet, UserViewSet)
 
 router = routers.DefaultRouter()
@@ -12,6 +12,7 @@ router.register(r'users', UserViewSet, basename='users')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path(r'^auth/', include('djoser.urls')),
     url(r'^auth/', include('djoser.urls.authtoken')),
 ]
@@ -0,0 +1,45 @@
+"""Change markers of the data behind API responses.
+
+A version is the time of the latest change in its scope. It lives in the
+cache shared by the workers, so reading one costs a cache hit instead of a
+query or a rendered body. A version lost to eviction comes back as the
+current time, which can only make clients refetch, never serve stale data.
+With a cache local to every process, versions live VERSION_TIMEOUT seconds,
+which bounds how long a worker misses the bumps of other processes.
+"""
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+TAGS = 'tags'
+INGREDIENTS = 'ingredients'
+RECIPES = 'recipes'
+VERSION_KEY = 'version:{scope}'
+
+
+def user_scope(user_id):
+    """Favorites, shopping list and follows of a single user."""
+    return f'user:{user_id}'
+
+
+def get_versions(*scopes):
+    keys = [VERSION_KEY.format(scope=scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time(), timeout=settings.VERSION_TIMEOUT)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*scopes):
+    """Deferred to commit, so no reader caches old rows as the new ones."""
+    def bump():
+        now = time()
+        cache.set_many(
+            {VERSION_KEY.format(scope=scope): now for scope in scopes},
+            timeout=settings.VERSION_TIMEOUT
+        )
+    transaction.on_commit(bump)
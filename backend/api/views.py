@@ -1,85 +1,117 @@
 from datetime import date
-from io import BytesIO
 
-from django.http import FileResponse
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Prefetch, Subquery
 from django.shortcuts import get_object_or_404
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.units import inch
-from reportlab.pdfgen import canvas
-from rest_framework import filters, status, viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import (AllowAny, IsAdminUser,
+                                        IsAuthenticated)
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
-from api.pagination import FlexiblePagination
+from api import metrics
+from api.conditional import ConditionalResponseMixin
+from api.exporters import EXPORTERS
+from api.filters import (INGREDIENT_SEARCH_LIMIT, POPULARITY_ORDERING,
+                         RELEVANCE_ORDERING, IngredientSearchFilter,
+                         RecipeFilter, RecipeOrderingFilter,
+                         RecipeSearchFilter, favorited_by, get_search_term,
+                         in_shopping_cart_of, is_popular_ordering)
+from api.pagination import FlexiblePagination, RankedListPagination
 from api.permissions import IsAdminOwnerOrReadOnly
+from api.replicas import ReplicaReadMixin
+from api.response_cache import AnonymousResponseCacheMixin
 from api.serializers import (ChangePasswordSerializer, IngredientSerializer,
                              RecipeSerializerSafe, RecipeSerializerShort,
                              RecipeSerializerUnsafe, TagSerializer,
                              UserSerializer, UserFollowedSerializer)
-from recipes.models import Favorite, Ingredient, Recipe, Tag
+from api.versions import INGREDIENTS, RECIPES, TAGS
+from recipes.catalogue import catalogue
+from recipes.inverted_index import recipe_index
+from recipes.models import (Favorite, Ingredient, IngredientPerRecipe,
+                            Recipe, Tag)
 from users.models import Follow, User
 from shopping.models import ShoppingList
 
 
-HORIZONTAL_OFFSET = 1
-VERTICAL_OFFSET = 11
-DOT_OFFSET = 100
-HEADER_FONT_SIZE = 18
-BODY_FONT_SIZE = 12
-
-
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(ReplicaReadMixin, ConditionalResponseMixin,
+                        viewsets.ReadOnlyModelViewSet):
+    version_scopes = (INGREDIENTS,)
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny,)
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('^name',)
+    filter_backends = (IngredientSearchFilter,)
+
+    def list(self, request, *args, **kwargs):
+        term = request.query_params.get(api_settings.SEARCH_PARAM, '').strip()
+        if term and settings.INGREDIENT_CATALOGUE_ENABLED:
+            return self.conditional(self.search_catalogue, request, term)
+        return super().list(request, *args, **kwargs)
 
+    def search_catalogue(self, request, term):
+        return Response(catalogue.search(term, INGREDIENT_SEARCH_LIMIT))
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+
+class TagViewSet(ReplicaReadMixin, ConditionalResponseMixin,
+                 viewsets.ReadOnlyModelViewSet):
+    version_scopes = (TAGS,)
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AllowAny,)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ReplicaReadMixin, ConditionalResponseMixin,
+                    AnonymousResponseCacheMixin, viewsets.ModelViewSet):
+    conditional_actions = ('retrieve',)
+    version_scopes = (RECIPES,)
+    cache_scopes = (RECIPES,)
+    per_user = True
     pagination_class = FlexiblePagination
+    filter_backends = (RecipeFilter, RecipeOrderingFilter, RecipeSearchFilter)
     permission_classes = (IsAdminOwnerOrReadOnly,)
 
+    @property
+    def cursor_ordering(self):
+        if get_search_term(self.request):
+            return RELEVANCE_ORDERING
+        if is_popular_ordering(self.request):
+            return POPULARITY_ORDERING
+        return ('-pub_date', '-id')
+
     def get_serializer_class(self):
-        if self.action in ('retrieve', 'list'):
+        if self.action in ('retrieve', 'list', 'cook_with'):
             return RecipeSerializerSafe
         if self.action in ('destroy', 'create', 'update', 'partial_update'):
             return RecipeSerializerUnsafe
         return RecipeSerializerShort
 
     def get_queryset(self):
-        queryset = Recipe.objects.all()
-        params = self.request.query_params
-
-        tags = params.getlist('tags')
-        if tags is not None:
-            queryset = queryset.filter(tags__slug__in=tags)
-        author = params.get('author')
-        if author is not None:
-            queryset = queryset.filter(author=author)
-
-        if params.get('is_favorited'):
-            queryset = queryset.filter(
-                is_favorited__in=Favorite.objects.filter(
-                    user=self.request.user
+        queryset = Recipe.objects.prefetch_related(
+            'tags',
+            Prefetch(
+                'ingredients',
+                queryset=IngredientPerRecipe.objects.select_related(
+                    'ingredient'
                 )
-            )
-
-        if params.get('is_in_shopping_cart'):
-            queryset = queryset.filter(
-                is_in_shopping_cart=ShoppingList.objects.get(
-                    owner=self.request.user
-                )
-            )
-        return queryset.distinct()
+            ),
+        )
+        user = self.request.user
+        if user.is_anonymous:
+            queryset = queryset.select_related('author')
+        else:
+            queryset = queryset.annotate(
+                favorited=favorited_by(user),
+                in_shopping_cart=in_shopping_cart_of(user),
+            ).prefetch_related(Prefetch(
+                'author',
+                queryset=User.objects.annotate(subscribed=Exists(
+                    Follow.objects.filter(user=user, author=OuterRef('pk'))
+                ))
+            ))
+        return queryset
 
     @action(
         detail=True,
@@ -117,43 +149,70 @@ class RecipeViewSet(viewsets.ModelViewSet):
         request.user.shopping_list.recipes.remove(recipe)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    def get_ingredient_ids(self):
+        ingredients = self.request.query_params.getlist('ingredients')
+        if not ingredients or not all(
+            ingredient.isdecimal() for ingredient in ingredients
+        ):
+            raise ValidationError(
+                {'ingredients': 'Укажите id имеющихся ингредиентов.'}
+            )
+        return [int(ingredient) for ingredient in ingredients]
+
+    def get_max_missing(self):
+        max_missing = self.request.query_params.get('max_missing')
+        if max_missing is None:
+            return None
+        if not max_missing.isdecimal():
+            raise ValidationError(
+                {'max_missing': 'Укажите целое неотрицательное число.'}
+            )
+        return int(max_missing)
+
+    @action(detail=False, pagination_class=RankedListPagination)
+    def cook_with(self, request):
+        """Recipes using ?ingredients=, fewest missing ingredients first."""
+        matches = recipe_index.cook_with(
+            self.get_ingredient_ids(),
+            self.get_max_missing()
+        )
+        page = self.paginate_queryset(matches)
+        recipes = self.get_queryset().in_bulk(
+            [recipe for recipe, covered, missing in page]
+        )
+        results = []
+        for recipe, covered, missing in page:
+            # Deleted by another worker whose index update we missed
+            if recipe not in recipes:
+                continue
+            item = self.get_serializer(recipes[recipe]).data
+            item['covered'] = covered
+            item['missing'] = missing
+            results.append(item)
+        return self.get_paginated_response(results)
+
     @action(
         detail=False,
-        permission_classes=(IsAuthenticated,)
+        permission_classes=(IsAuthenticated,),
+        renderer_classes=EXPORTERS
     )
     def download_shopping_cart(self, request):
-        SHOPPING_STRING = '{name}{offset}{amount} {unit}'
-        buffer = BytesIO()
-        pdf = canvas.Canvas(buffer)
-        text = pdf.beginText()
-        text.setTextOrigin(HORIZONTAL_OFFSET * inch, VERTICAL_OFFSET * inch)
-        text.setFont('Helvetica', HEADER_FONT_SIZE)
-        text.textLine('FOODGRAM')
-        pdfmetrics.registerFont(TTFont(
-            'FreeSans',
-            'api/static/fonts/FreeSans.ttf'
-        ))
-        text.setFont('FreeSans', BODY_FONT_SIZE)
-        for pk, amount in (request.user.shopping_list
-                           .calculate_ingredients().items()):
-            ingredient = Ingredient.objects.get(pk=pk)
-            text.textLine(SHOPPING_STRING.format(
-                name=ingredient.name.capitalize(),
-                offset='.' * (DOT_OFFSET - len(ingredient.name)),
-                amount=amount,
-                unit=ingredient.get_unit_display()
-            ))
-        pdf.drawText(text)
-        pdf.showPage()
-        pdf.save()
-        buffer.seek(0)
-        return FileResponse(buffer, filename=f'shopping_{date.today()}.pdf')
+        shopping_list = ShoppingList.objects.filter(owner=request.user).first()
+        rows = (shopping_list.calculate_ingredients()
+                if shopping_list is not None else [])
+        response = Response(rows)
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping_{date.today()}'
+            f'.{request.accepted_renderer.format}"'
+        )
+        return response
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     pagination_class = FlexiblePagination
+    cursor_ordering = ('id',)
     permission_classes = (AllowAny,)
 
     @action(
@@ -172,6 +231,37 @@ class UserViewSet(viewsets.ModelViewSet):
         user.save()
         return Response(status=status.HTTP_201_CREATED)
 
+    def get_recipes_limit(self):
+        limit = self.request.query_params.get('recipes_limit')
+        if limit is None:
+            return None
+        if not limit.isdecimal():
+            raise ValidationError(
+                {'recipes_limit': 'Укажите целое неотрицательное число.'}
+            )
+        return int(limit)
+
+    def annotate_followed(self, queryset):
+        """Prefetch top recipes_limit recipes only."""
+        recipes = Recipe.objects.all()
+        limit = self.get_recipes_limit()
+        if limit is not None:
+            recipes = recipes.filter(pk__in=Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('author')
+                ).values('pk')[:limit]
+            ))
+        return queryset.annotate(
+            subscribed=Exists(Follow.objects.filter(
+                user=self.request.user,
+                author=OuterRef('pk')
+            )),
+        ).prefetch_related(Prefetch(
+            'recipes',
+            queryset=recipes,
+            to_attr='recipes_preview'
+        ))
+
     @action(detail=False, permission_classes=(IsAuthenticated,))
     def me(self, request):
         return Response(self.get_serializer(request.user).data)
@@ -182,9 +272,9 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,),
     )
     def subscriptions(self, request):
-        queryset = User.objects.filter(
+        queryset = self.annotate_followed(User.objects.filter(
             is_subscribed__in=request.user.follows.all()
-        )
+        ).order_by('id'))
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -204,6 +294,9 @@ class UserViewSet(viewsets.ModelViewSet):
                 user=request.user,
                 author=author,
             )
+            author = self.annotate_followed(
+                User.objects.filter(pk=author.pk)
+            ).get()
             return Response(self.get_serializer(author).data)
         follow = get_object_or_404(
             Follow,
@@ -212,3 +305,12 @@ class UserViewSet(viewsets.ModelViewSet):
         )
         follow.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MetricsView(APIView):
+    """Request histograms of this worker for Prometheus to scrape."""
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (metrics.PrometheusRenderer,)
+
+    def get(self, request):
+        return Response(metrics.expose())
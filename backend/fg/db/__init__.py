@@ -0,0 +1,16 @@
+"""Connection handling Django 2.2 lacks: health checks and pooling."""
+from django.db import connections
+
+
+def check_connections(**kwargs):
+    """CONN_HEALTH_CHECKS of newer Django for persistent connections.
+
+    Runs on request_started: a connection the server dropped since the last
+    request (restart, idle timeout) is closed here with a SELECT 1, so the
+    view reconnects instead of failing on its first query.
+    """
+    for connection in connections.all():
+        if (connection.settings_dict.get('CONN_HEALTH_CHECKS')
+                and connection.connection is not None
+                and not connection.is_usable()):
+            connection.close()
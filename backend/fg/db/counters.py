@@ -0,0 +1,21 @@
+class CounterFieldsMixin:
+    """Keeps saves of a loaded row from writing back its counter_fields.
+
+    Counters only change by atomic F() updates (recipes.counters), so the
+    values of an instance loaded before them, e.g. a cached request.user,
+    are stale and a full UPDATE would undo those increments.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            # Deferred fields stay unloaded and unwritten, as in Model.save()
+            skipped = {*self.counter_fields, *self.get_deferred_fields()}
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in skipped
+                and field.name not in skipped
+            ]
+        super().save(*args, **kwargs)
@@ -0,0 +1,100 @@
+"""PostgreSQL backend borrowing connections from a per-process pool.
+
+For threaded workers (gunicorn --threads): DB_ENGINE=fg.db.pooled with
+CONN_MAX_AGE 0 hands the connection back to the pool at the end of every
+request instead of closing it, so threads share POOL['MAX_SIZE']
+connections that stay open. Requests wait up to POOL['TIMEOUT'] seconds
+for a free one.
+"""
+from threading import BoundedSemaphore, Lock
+
+from django.db import OperationalError
+from django.db.backends.postgresql import base
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+DEFAULT_POOL = {'MAX_SIZE': 10, 'TIMEOUT': 10}
+POOL_EXHAUSTED = 'No free database connection in {timeout} s.'
+
+pools = {}
+pools_lock = Lock()
+
+
+class ConnectionPool:
+    def __init__(self, max_size, timeout, health_checks=False):
+        self.timeout = timeout
+        self.health_checks = health_checks
+        self._idle = []
+        self._lock = Lock()
+        self._slots = BoundedSemaphore(max_size)
+
+    def acquire(self, connect):
+        """Newest idle connection, or a fresh one from connect()."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(POOL_EXHAUSTED.format(timeout=self.timeout))
+        try:
+            while True:
+                with self._lock:
+                    connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    return connect()
+                if self.is_usable(connection):
+                    return connection
+                connection.close()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection):
+        """Returns the connection rolled back to a clean state."""
+        try:
+            if (not connection.closed and connection.get_transaction_status()
+                    != TRANSACTION_STATUS_IDLE):
+                connection.rollback()
+        except Exception:
+            connection.close()
+        if not connection.closed:
+            with self._lock:
+                self._idle.append(connection)
+        self._slots.release()
+
+    def is_usable(self, connection):
+        if connection.closed:
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            connection.cursor().execute('SELECT 1')
+        except Exception:
+            return False
+        return True
+
+
+def get_pool(settings_dict):
+    key = (settings_dict['HOST'], settings_dict['PORT'], settings_dict['NAME'])
+    with pools_lock:
+        if key not in pools:
+            options = {**DEFAULT_POOL, **settings_dict.get('POOL', {})}
+            pools[key] = ConnectionPool(
+                options['MAX_SIZE'],
+                options['TIMEOUT'],
+                settings_dict.get('CONN_HEALTH_CHECKS', False),
+            )
+        return pools[key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        connection = get_pool(self.settings_dict).acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+        )
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                get_pool(self.settings_dict).release(self.connection)
@@ -0,0 +1,35 @@
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+state = threading.local()
+
+
+def read_from_replicas(enabled):
+    """Switch reads of the current thread to DATABASE_REPLICAS or back."""
+    state.replicas = enabled
+
+
+class ReplicaRouter:
+    """Reads go to a random replica once read_from_replicas(True) was called.
+
+    Everything else, writes and reads inside a transaction included, stays
+    on the primary, which is also the only database migrated.
+    """
+    def db_for_read(self, model, **hints):
+        if (not getattr(state, 'replicas', False)
+                or not settings.DATABASE_REPLICAS
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
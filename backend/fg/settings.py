@@ -24,12 +24,13 @@ INSTALLED_APPS = [
     'djoser',
     'reportlab',
     'users',
-    'recipes',
+    'recipes.apps.RecipesConfig',
     'shopping',
-    'api',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,9 +74,58 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgresqwerty'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Seconds to keep a connection between requests, 0 closes it
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default='0')),
+        # SELECT 1 before reusing a persistent connection, see fg.db
+        'CONN_HEALTH_CHECKS': (
+            os.getenv('DB_CONN_HEALTH_CHECKS', default='') == 'true'
+        ),
+        # Used by the fg.db.pooled engine only
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default='10')),
+            'TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', default='10')),
+        },
+    }
+}
+
+# Read replicas: comma separated hosts, or database files for SQLite, e.g.
+# DB_REPLICAS=replica1:5432, replica2:5432
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(','))
+):
+    replica = replica.strip()
+    alias = f'replica_{number}'
+    DATABASES[alias] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if DATABASES[alias]['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES[alias]['NAME'] = replica
+    else:
+        DATABASES[alias]['HOST'], _, port = replica.partition(':')
+        DATABASES[alias]['PORT'] = port or DATABASES['default']['PORT']
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['fg.db.routers.ReplicaRouter']
+# Reads of a user stay on the primary this long after their writes
+REPLICA_PIN_SECONDS = 5
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
     }
 }
+# A process-local cache never sees the version bumps of other processes
+# (workers, admin, management commands), so its versions expire instead.
+# infra/docker-compose.yml points the workers at a shared memcached.
+VERSION_TIMEOUT = (
+    60 if CACHES['default']['BACKEND'].endswith('.LocMemCache') else None
+)
+# Any Django cache backend works, e.g. django_redis.cache.RedisCache
+RESPONSE_CACHE_ALIAS = os.getenv('RESPONSE_CACHE_ALIAS', default='default')
+RESPONSE_CACHE_TIMEOUT = 60 * 10
 
 
 REST_FRAMEWORK = {
@@ -83,13 +133,33 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAdminUser',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'SEARCH_PARAM': 'name',
 }
 
 AUTH_USER_MODEL = 'users.User'
 
+# Token -> user lookups of api.authentication.CachedTokenAuthentication
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_SIZE = 10000
+# A shared cache alias makes logouts and deactivations apply at once in
+# every worker instead of within TOKEN_CACHE_TTL
+TOKEN_CACHE_ALIAS = os.getenv('TOKEN_CACHE_ALIAS') or None
+
+# Server-Timing response headers with SQL and render timings
+SERVER_TIMING = DEBUG
+# Log requests slower than this many seconds, 0 turns logging off
+SLOW_REQUEST_THRESHOLD = float(
+    os.getenv('SLOW_REQUEST_THRESHOLD', default='1')
+)
+
+# Serve ?name= ingredient lookups from the in-process catalogue
+INGREDIENT_CATALOGUE_ENABLED = True
+INGREDIENT_CATALOGUE_TTL = 300
+# Reload period of the in-process ingredient -> recipes index
+RECIPE_INDEX_TTL = 300
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': ('django.contrib.auth.password_validation'
@@ -124,3 +194,6 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+IMAGE_UPLOAD_MAX_SIZE = 5 * 2 ** 20
+IMAGE_RENDITION_WORKERS = 2
@@ -0,0 +1,22 @@
+"""Production profile, selected by DJANGO_SETTINGS_MODULE in the image.
+
+Sync gunicorn workers keep one persistent, health checked connection each.
+Threaded workers can share a per-process pool instead: DB_ENGINE=fg.db.pooled
+with DB_POOL_MAX_SIZE no lower than gunicorn --threads.
+"""
+import os
+
+from fg.settings import *  # noqa: F401, F403
+from fg.settings import DATABASES
+
+DEBUG = False
+SERVER_TIMING = False
+
+for database in DATABASES.values():
+    database.update(
+        CONN_MAX_AGE=int(os.getenv('DB_CONN_MAX_AGE', default='600')),
+        CONN_HEALTH_CHECKS=True,
+    )
+    if database['ENGINE'] == 'fg.db.pooled':
+        # Pooled connections go back to the pool when a request ends
+        database['CONN_MAX_AGE'] = 0
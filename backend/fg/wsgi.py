@@ -5,3 +5,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fg.settings')
 
 application = get_wsgi_application()
+
+from recipes.catalogue import catalogue  # noqa: E402
+from recipes.inverted_index import recipe_index  # noqa: E402
+
+catalogue.warm_up()
+recipe_index.warm_up()
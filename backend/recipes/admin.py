@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Recipe, Tag, Ingredient, IngredientPerRecipe
+from .models import Recipe, RecipeTag, Tag, Ingredient, IngredientPerRecipe
 
 
 class RecipeIngredientInline(admin.TabularInline):
@@ -8,14 +8,16 @@ class RecipeIngredientInline(admin.TabularInline):
     min_num = 1
 
 
+class RecipeTagInline(admin.TabularInline):
+    model = RecipeTag
+    min_num = 1
+
+
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'favorited_count')
-    search_fields = ('text',)
+    list_display = ('title', 'author', 'favorites_count')
+    search_fields = ('title', 'description')
     list_filter = ('author', 'title', 'tags')
-    inlines = (RecipeIngredientInline,)
-
-    def favorited_count(self, obj):
-        return obj.is_favorited.all().count()
+    inlines = (RecipeIngredientInline, RecipeTagInline)
 
 
 class TagAdmin(admin.ModelAdmin):
@@ -0,0 +1,75 @@
+"""In-process copy of the ingredient table for autocomplete lookups.
+
+The table is static reference data, so every worker keeps it as a sorted
+array of casefolded names: prefix matches are a bisect away, substring ones
+a scan over a couple thousand short strings. Ingredient signals drop the
+copy of the current process, and the TTL bounds how long other processes
+(workers, import commands) can serve a stale one.
+"""
+from bisect import bisect_left
+from time import monotonic
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from recipes.models import Ingredient
+
+
+class IngredientCatalogue:
+    def __init__(self):
+        self._snapshot = None
+        self._loaded_at = 0
+
+    def load(self):
+        units = dict(Ingredient.UNIT_CHOICES)
+        entries = sorted(
+            (name.casefold(), name, pk, units.get(unit, unit))
+            for pk, name, unit
+            in Ingredient.objects.values_list('pk', 'name', 'unit')
+        )
+        snapshot = ([entry[0] for entry in entries], entries)
+        self._snapshot = snapshot
+        self._loaded_at = monotonic()
+        return snapshot
+
+    def warm_up(self):
+        """Load at worker start unless the schema is not migrated yet."""
+        try:
+            self.load()
+        except DatabaseError:
+            self.invalidate()
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def get_snapshot(self):
+        """Read once: invalidate() may reset the attribute at any moment."""
+        snapshot = self._snapshot
+        if (snapshot is None or monotonic() - self._loaded_at
+                > settings.INGREDIENT_CATALOGUE_TTL):
+            snapshot = self.load()
+        return snapshot
+
+    def search(self, term, limit):
+        """Prefix matches first, then substring ones, both sorted by name."""
+        keys, entries = self.get_snapshot()
+        term = term.casefold()
+        matches = []
+        index = bisect_left(keys, term)
+        while (index < len(keys) and len(matches) < limit
+               and keys[index].startswith(term)):
+            matches.append(entries[index])
+            index += 1
+        if len(matches) < limit:
+            for entry in entries:
+                if entry[0].find(term) > 0:
+                    matches.append(entry)
+                    if len(matches) == limit:
+                        break
+        return [
+            {'id': pk, 'name': name, 'measurement_unit': unit}
+            for _, name, pk, unit in matches
+        ]
+
+
+catalogue = IngredientCatalogue()
@@ -0,0 +1,32 @@
+"""Denormalized counter columns and their maintenance helpers."""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favorite, Recipe
+from shopping.models import ShoppingList
+from users.models import Follow, User
+
+# (model, counter field, counted model, its field pointing at the model)
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Follow, 'author'),
+    (ShoppingList, 'recipes_count', ShoppingList.recipes.through,
+     'shoppinglist'),
+)
+
+
+def increment(queryset, field, by=1):
+    """Atomic counter update; never lets a drifted counter go negative."""
+    if by < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -by})
+    queryset.update(**{field: F(field) + by})
+
+
+def count_of(model, field):
+    """Number of model rows whose field points at the outer row."""
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values('total')
+    ), 0)
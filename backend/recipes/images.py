@@ -0,0 +1,106 @@
+"""Recipe photo renditions made off the request thread.
+
+Lists show photos as small cards, so every upload gets a thumbnail, a card
+and a WebP card next to the original. A small thread pool renders them
+after the transaction commits and marks the recipes using the photo with
+has_renditions; until then the original is served instead, so building the
+URLs never has to ask the storage.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.dispatch import Signal
+from PIL import Image
+
+from recipes.models import Recipe
+
+RENDITIONS = (
+    # (name, bounding box, Pillow format, extension)
+    ('thumbnail', (160, 160), 'JPEG', 'jpg'),
+    ('card', (480, 480), 'JPEG', 'jpg'),
+    ('card_webp', (480, 480), 'WEBP', 'webp'),
+)
+RENDITION_PATH = 'recipes/renditions/{stem}-{rendition}.{extension}'
+
+logger = logging.getLogger(__name__)
+renditions_ready = Signal(providing_args=['name'])
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_RENDITION_WORKERS,
+    thread_name_prefix='renditions'
+)
+# Identical uploads share a name, render each of them once at a time
+pending = set()
+pending_lock = Lock()
+
+
+def rendition_name(name, rendition, extension):
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return RENDITION_PATH.format(
+        stem=stem,
+        rendition=rendition,
+        extension=extension
+    )
+
+
+def rendition_urls(image, ready):
+    """{rendition: url}, the original standing in until they are ready."""
+    if not ready:
+        return {rendition: image.url for rendition, *_ in RENDITIONS}
+    return {
+        rendition: default_storage.url(
+            rendition_name(image.name, rendition, extension)
+        )
+        for rendition, _, _, extension in RENDITIONS
+    }
+
+
+def schedule_renditions(name):
+    transaction.on_commit(lambda: submit_renditions(name))
+
+
+def submit_renditions(name):
+    with pending_lock:
+        if name in pending:
+            return
+        pending.add(name)
+    executor.submit(make_pending_renditions, name)
+
+
+def make_pending_renditions(name):
+    try:
+        make_renditions(name)
+    finally:
+        with pending_lock:
+            pending.discard(name)
+        # Pool threads would keep a connection each for good
+        connection.close()
+
+
+def make_renditions(name):
+    try:
+        with default_storage.open(name) as file:
+            original = Image.open(file)
+            original.load()
+        original = original.convert('RGB')
+        for rendition, size, image_format, extension in RENDITIONS:
+            target = rendition_name(name, rendition, extension)
+            if default_storage.exists(target):
+                continue
+            image = original.copy()
+            image.thumbnail(size)
+            buffer = BytesIO()
+            image.save(buffer, format=image_format, quality=85)
+            default_storage.save(target, ContentFile(buffer.getvalue()))
+    except Exception:
+        logger.exception('Cannot make renditions of %s', name)
+        return
+    # Before the signal: its receivers bump the version of recipe responses
+    Recipe.objects.filter(image=name).update(has_renditions=True)
+    renditions_ready.send(sender=None, name=name)
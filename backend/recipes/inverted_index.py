@@ -0,0 +1,121 @@
+"""In-process inverted index of recipe compositions for "cook with" lookups.
+
+Every worker maps ingredient ids to sorted arrays of the recipes using
+them, so scoring recipes against the ingredients at hand is a walk over a
+few posting lists instead of a GROUP BY over the whole composition table.
+Composition writes of the current process are re-read for the recipes
+they touch once committed; the TTL bounds how long other processes keep an
+index missing them.
+"""
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from recipes.models import IngredientPerRecipe
+
+
+class RecipeIndex:
+    def __init__(self):
+        self._postings = None
+        self._compositions = None
+        self._loaded_at = 0
+        self._lock = Lock()
+
+    def load(self):
+        postings = {}
+        compositions = {}
+        rows = IngredientPerRecipe.objects.order_by(
+            'ingredient_id', 'recipe_id'
+        ).values_list('ingredient', 'recipe')
+        for ingredient, recipe in rows.iterator():
+            postings.setdefault(ingredient, array('q')).append(recipe)
+            compositions.setdefault(recipe, []).append(ingredient)
+        compositions = {
+            recipe: tuple(ingredients)
+            for recipe, ingredients in compositions.items()
+        }
+        with self._lock:
+            self._postings = postings
+            self._compositions = compositions
+            self._loaded_at = monotonic()
+        return postings, compositions
+
+    def warm_up(self):
+        """Load at worker start unless the schema is not migrated yet."""
+        try:
+            self.load()
+        except DatabaseError:
+            self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._postings = None
+
+    def ensure_loaded(self):
+        """Current (postings, compositions), reloaded when missing or old."""
+        with self._lock:
+            postings, compositions = self._postings, self._compositions
+        if (postings is None or monotonic() - self._loaded_at
+                > settings.RECIPE_INDEX_TTL):
+            postings, compositions = self.load()
+        return postings, compositions
+
+    def schedule_refresh(self, *recipes):
+        """Re-read the compositions of recipes once the write commits."""
+        transaction.on_commit(lambda: self.refresh(recipes))
+
+    def refresh(self, recipes):
+        """Re-index recipes from the database, dropping deleted ones."""
+        if self._postings is None:
+            return
+        compositions = {recipe: [] for recipe in recipes}
+        rows = IngredientPerRecipe.objects.filter(
+            recipe__in=recipes
+        ).values_list('recipe', 'ingredient')
+        for recipe, ingredient in rows:
+            compositions[recipe].append(ingredient)
+        for recipe, ingredients in compositions.items():
+            self.update(recipe, tuple(ingredients))
+
+    def update(self, recipe, ingredients):
+        with self._lock:
+            if self._postings is None:
+                return
+            for ingredient in self._compositions.pop(recipe, ()):
+                posting = self._postings[ingredient]
+                index = bisect_left(posting, recipe)
+                if index < len(posting) and posting[index] == recipe:
+                    del posting[index]
+            for ingredient in ingredients:
+                insort(
+                    self._postings.setdefault(ingredient, array('q')), recipe
+                )
+            if ingredients:
+                self._compositions[recipe] = ingredients
+
+    def cook_with(self, ingredients, max_missing=None):
+        """[(recipe, covered, missing)] for recipes using any of ingredients.
+
+        Fewest missing ingredients first, then most covered, then newest.
+        """
+        postings, compositions = self.ensure_loaded()
+        with self._lock:
+            covered = Counter()
+            for ingredient in set(ingredients):
+                covered.update(postings.get(ingredient, ()))
+            matches = [
+                (recipe, count, len(compositions[recipe]) - count)
+                for recipe, count in covered.items()
+            ]
+        if max_missing is not None:
+            matches = [match for match in matches if match[2] <= max_missing]
+        matches.sort(key=lambda match: (match[2], -match[1], -match[0]))
+        return matches
+
+
+recipe_index = RecipeIndex()
@@ -0,0 +1,78 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.images import RENDITION_PATH
+from recipes.models import Recipe
+
+RECIPES_DIR = 'recipes'
+RENDITIONS_DIR = posixpath.dirname(RENDITION_PATH)
+
+
+def walk(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for subdirectory in directories:
+        yield from walk(storage, posixpath.join(directory, subdirectory))
+
+
+def stem(name):
+    return posixpath.splitext(posixpath.basename(name))[0]
+
+
+def rendition_stem(name):
+    return stem(name).rsplit('-', 1)[0]
+
+
+def still_orphaned(storage, name, threshold):
+    """Re-check right before deleting: the file may have been reused."""
+    if storage.get_modified_time(name) > threshold:
+        return False
+    if name.startswith(RENDITIONS_DIR + '/'):
+        references = Recipe.objects.filter(
+            image__contains=rendition_stem(name)
+        )
+    else:
+        references = Recipe.objects.filter(image=name)
+    return not references.exists()
+
+
+class Command(BaseCommand):
+    help = ('Deletes recipe photos and renditions no recipe refers to. '
+            'Files younger than --min-age minutes are kept, their recipe '
+            'may still be on its way to the database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=int, default=60)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        storage = Recipe._meta.get_field('image').storage
+        if not storage.exists(RECIPES_DIR):
+            return
+        referenced = set(
+            Recipe.objects.values_list('image', flat=True).iterator()
+        )
+        stems = {stem(name) for name in referenced}
+        threshold = timezone.now() - timedelta(minutes=options['min_age'])
+        removed = 0
+        for name in walk(storage, RECIPES_DIR):
+            if name.startswith(RENDITIONS_DIR + '/'):
+                orphaned = rendition_stem(name) not in stems
+            else:
+                orphaned = name not in referenced
+            if not orphaned or storage.get_modified_time(name) > threshold:
+                continue
+            # Uploaded again since the referenced snapshot was taken
+            if not still_orphaned(storage, name, threshold):
+                continue
+            removed += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(name)
+            if not options['dry_run']:
+                storage.delete(name)
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {removed} files'))
@@ -1,18 +1,125 @@
+from itertools import groupby, islice
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from recipes.inverted_index import recipe_index
+from recipes.models import Ingredient, IngredientPerRecipe
+
+MERGE_CHUNK = 500
+UNITS = dict(Ingredient.UNIT_CHOICES)
+
+
+def normalize(name):
+    """Case, spacing and ё/е insensitive form of a name."""
+    return ' '.join(name.casefold().replace('ё', 'е').split())
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
-from recipes.models import Ingredient
+
+def exact_groups():
+    names = Ingredient.objects.values('name').annotate(
+        total=Count('id')
+    ).filter(total__gt=1).values('name')
+    ingredients = Ingredient.objects.filter(name__in=names).order_by(
+        'name', 'id'
+    ).values_list('id', 'name', 'unit')
+    for _, group in groupby(ingredients, key=lambda row: row[1]):
+        yield list(group)
+
+
+def normalized_groups(by_unit=False):
+    groups = {}
+    ingredients = Ingredient.objects.order_by('id').values_list(
+        'id', 'name', 'unit'
+    )
+    for row in ingredients.iterator():
+        key = (normalize(row[1]), row[2] if by_unit else None)
+        groups.setdefault(key, []).append(row)
+    return (group for group in groups.values() if len(group) > 1)
+
+
+def merge_chunk(replacements):
+    """Moves recipe ingredients of the given duplicates to their keepers,
+    summing amounts where a recipe had both, and drops the duplicates."""
+    duplicates = list(replacements)
+    rows = IngredientPerRecipe.objects.filter(
+        Q(ingredient__in=duplicates)
+        | Q(
+            ingredient__in=set(replacements.values()),
+            recipe__in=IngredientPerRecipe.objects.filter(
+                ingredient__in=duplicates
+            ).values('recipe'),
+        )
+    ).only('id', 'recipe_id', 'ingredient_id', 'amount')
+    survivors = {}
+    doomed = []
+    moved = 0
+    for row in rows:
+        if row.ingredient_id in replacements:
+            row.ingredient_id = replacements[row.ingredient_id]
+            moved += 1
+        key = (row.recipe_id, row.ingredient_id)
+        survivor = survivors.setdefault(key, row)
+        if survivor is not row:
+            survivor.amount += row.amount
+            doomed.append(row.id)
+    IngredientPerRecipe.objects.filter(id__in=doomed).delete()
+    IngredientPerRecipe.objects.bulk_update(
+        survivors.values(), ('ingredient', 'amount')
+    )
+    recipe_index.schedule_refresh(*{recipe for recipe, _ in survivors})
+    Ingredient.objects.filter(id__in=duplicates).delete()
+    return moved
 
 
 class Command(BaseCommand):
     """The answer is пекарский порошок & стейк семги."""
-    help = 'Seeks duplicates among ingredients.'
+    help = ('Seeks duplicates among ingredients: same name by default, '
+            'same name up to case, spacing and ё with --normalize.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--normalize', action='store_true')
+        parser.add_argument(
+            '--merge',
+            action='store_true',
+            help=('Merges normalized duplicates of the same unit into the '
+                  'oldest of them, moving their recipe ingredients over.'),
+        )
 
     def handle(self, *args, **options):
-        ingredient_list = list(Ingredient.objects.all())
-        ingredient_total_number = len(ingredient_list)
-        for i in range(ingredient_total_number):
-            for j in range(i + 1, ingredient_total_number):
-                if ingredient_list[i].name == ingredient_list[j].name:
-                    self.stdout.write(
-                        self.style.SUCCESS(ingredient_list[i].name)
-                    )
+        if options['merge']:
+            self.merge()
+            return
+        groups = (
+            normalized_groups() if options['normalize'] else exact_groups()
+        )
+        total = 0
+        for group in groups:
+            total += 1
+            self.stdout.write(', '.join(
+                f'{name} ({UNITS.get(unit, unit)}) #{id}'
+                for id, name, unit in group
+            ))
+        self.stdout.write(self.style.SUCCESS(f'{total} duplicate groups'))
+
+    @transaction.atomic
+    def merge(self):
+        replacements = {}
+        for keeper, *duplicates in normalized_groups(by_unit=True):
+            replacements.update((row[0], keeper[0]) for row in duplicates)
+        moved = 0
+        for chunk in chunked(replacements.items(), MERGE_CHUNK):
+            moved += merge_chunk(dict(chunk))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(replacements)} duplicates merged, '
+            f'{moved} recipe ingredients repointed'
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import make_renditions
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Makes missing thumbnail/card renditions of all recipe photos.'
+
+    def handle(self, *args, **options):
+        names = Recipe.objects.values_list('image', flat=True).distinct()
+        total = 0
+        for name in names.iterator():
+            make_renditions(name)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked renditions of {total} photos'
+        ))
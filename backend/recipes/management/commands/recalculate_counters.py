@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from recipes.counters import COUNTERS, count_of
+
+
+class Command(BaseCommand):
+    help = ('Recomputes favorites, recipes, followers and shopping list '
+            'counters in bulk, repairing the drifted ones.')
+
+    def handle(self, *args, **options):
+        for model, field, counted, related_field in COUNTERS:
+            with transaction.atomic():
+                drifted = model.objects.annotate(
+                    actual=count_of(counted, related_field)
+                ).exclude(**{field: F('actual')}).values('pk')
+                repaired = model.objects.filter(pk__in=drifted).update(
+                    **{field: count_of(counted, related_field)}
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.label}.{field}: {repaired} repaired'
+            ))
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.versions import RECIPES, bump_versions
+from recipes.counters import count_of
+from recipes.models import Recipe, RecipeRanking
+from shopping.models import ShoppingList
+
+GRAVITY = 1.8
+CART_WEIGHT = 1.0
+HOUR = 3600
+
+
+def decayed(votes, age_hours, gravity):
+    """Hacker News style: votes fade as the recipe gets older."""
+    return votes / (age_hours + 2) ** gravity
+
+
+class Command(BaseCommand):
+    """Meant for cron, e.g. every 10 minutes:
+
+    */10 * * * * python manage.py refresh_recipe_ranking
+    """
+    help = ('Ranks recipes by favorites and shopping cart additions with '
+            'time decay for ?ordering=popular.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gravity', type=float, default=GRAVITY)
+        parser.add_argument(
+            '--cart-weight',
+            type=float,
+            default=CART_WEIGHT,
+            help='Worth of a shopping cart addition against a favorite.',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        recipes = Recipe.objects.order_by().annotate(
+            carts=count_of(ShoppingList.recipes.through, 'recipe')
+        ).values_list('pk', 'pub_date', 'favorites_count', 'carts')
+        ranking = sorted(
+            (
+                (decayed(
+                    favorites + carts * options['cart_weight'],
+                    (now - pub_date).total_seconds() / HOUR,
+                    options['gravity'],
+                ), pub_date, pk)
+                for pk, pub_date, favorites, carts in recipes.iterator()
+            ),
+            reverse=True,
+        )
+        with transaction.atomic():
+            RecipeRanking.objects.all().delete()
+            RecipeRanking.objects.bulk_create(
+                RecipeRanking(recipe_id=pk, score=score, position=position)
+                for position, (score, _, pk) in enumerate(ranking, 1)
+            )
+            bump_versions(RECIPES)
+        self.stdout.write(self.style.SUCCESS(f'{len(ranking)} recipes ranked'))
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+CREATE_EXTENSION = 'CREATE EXTENSION IF NOT EXISTS pg_trgm'
+CREATE_INDEX = (
+    'CREATE INDEX IF NOT EXISTS recipes_ingredient_name_trgm '
+    'ON recipes_ingredient USING gin (UPPER(name) gin_trgm_ops)'
+)
+DROP_INDEX = 'DROP INDEX IF EXISTS recipes_ingredient_name_trgm'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_EXTENSION)
+        schema_editor.execute(CREATE_INDEX)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_auto_20230307_1739'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
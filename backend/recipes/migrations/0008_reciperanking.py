@@ -0,0 +1,27 @@
+# Generated by Django 2.2.19 on 2026-10-18 06:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_favorites_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeRanking',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='recipes.Recipe', verbose_name='рецепт')),
+                ('score', models.FloatField(verbose_name='популярность')),
+                ('position', models.PositiveIntegerField(unique=True, verbose_name='место')),
+            ],
+            options={
+                'verbose_name': 'место в рейтинге',
+                'verbose_name_plural': 'рейтинг рецептов',
+                'ordering': ('position',),
+            },
+        ),
+    ]
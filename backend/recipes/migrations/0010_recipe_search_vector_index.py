@@ -0,0 +1,41 @@
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_CONFIG = 'russian'
+CREATE_INDEX = (
+    'CREATE INDEX IF NOT EXISTS recipes_recipe_search_vector '
+    'ON recipes_recipe USING gin (search_vector)'
+)
+DROP_INDEX = 'DROP INDEX IF EXISTS recipes_recipe_search_vector'
+
+
+def fill_search_vectors(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    if schema_editor.connection.vendor == 'postgresql':
+        Recipe.objects.update(search_vector=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        ))
+        schema_editor.execute(CREATE_INDEX)
+        return
+    recipes = Recipe.objects.values_list('pk', 'title', 'description')
+    for pk, title, description in recipes.iterator():
+        Recipe.objects.filter(pk=pk).update(search_vector=' '.join(
+            f'{title} {description}'.casefold().replace('ё', 'е').split()
+        ))
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_search_vectors, drop_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.19 on 2026-10-18 06:52
+import os
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+RENDITION_FILES = (
+    ('thumbnail', 'jpg'),
+    ('card', 'jpg'),
+    ('card_webp', 'webp'),
+)
+
+
+def has_renditions(name):
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return all(
+        default_storage.exists(
+            f'recipes/renditions/{stem}-{rendition}.{extension}'
+        )
+        for rendition, extension in RENDITION_FILES
+    )
+
+
+def mark_rendered(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    names = Recipe.objects.values_list('image', flat=True).distinct()
+    Recipe.objects.filter(
+        image__in=[name for name in names if has_renditions(name)]
+    ).update(has_renditions=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_search_vector_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='has_renditions',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(mark_rendered, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 2.2.19 on 2026-10-18 07:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """Takes over the auto-created m2m table and the index of 0004.
+
+    Both exist already, so only the migration state changes.
+    """
+
+    dependencies = [
+        ('recipes', '0011_recipe_has_renditions'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.CreateModel(
+                name='RecipeTag',
+                fields=[
+                    ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                    ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.Recipe')),
+                    ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.Tag')),
+                ],
+                options={
+                    'verbose_name': 'тег рецепта',
+                    'verbose_name_plural': 'теги рецептов',
+                    'db_table': 'recipes_recipe_tags',
+                    'unique_together': {('recipe', 'tag')},
+                },
+            ),
+            migrations.AddIndex(
+                model_name='recipetag',
+                index=models.Index(fields=['tag', 'recipe'], name='recipes_recipe_tags_tag_recipe'),
+            ),
+            migrations.AlterField(
+                model_name='recipe',
+                name='tags',
+                field=models.ManyToManyField(related_name='recipes', through='recipes.RecipeTag', to='recipes.Tag'),
+            ),
+        ]),
+    ]
@@ -1,6 +1,9 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+from fg.db.counters import CounterFieldsMixin
+from recipes.storage import ContentAddressedStorage
 from users.models import User
 
 
@@ -93,8 +96,9 @@ class Ingredient(models.Model):
         return self.name
 
 
-class Recipe(models.Model):
+class Recipe(CounterFieldsMixin, models.Model):
     STR_PRESENTATION = ('{title} by {author} ({pub_date:.%Y.%m.%d})')
+    counter_fields = ('favorites_count',)
     title = models.CharField(
         max_length=64,
         verbose_name='название',
@@ -107,7 +111,7 @@ class Recipe(models.Model):
     cooking_time = models.DurationField(verbose_name='время приготовления')
     image = models.ImageField(
         upload_to='recipes/',
-        unique=True,
+        storage=ContentAddressedStorage(),
         verbose_name='фото',
     )
     pub_date = models.DateTimeField(
@@ -120,11 +124,30 @@ class Recipe(models.Model):
         on_delete=models.CASCADE,
         related_name='recipes',
     )
-    tags = models.ManyToManyField(Tag, related_name='recipes')
+    tags = models.ManyToManyField(
+        Tag,
+        through='RecipeTag',
+        related_name='recipes',
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='в избранном',
+    )
+    # Set by recipes.images once all renditions of the photo are stored
+    has_renditions = models.BooleanField(default=False, editable=False)
+    # tsvector on Postgres, casefolded text elsewhere, see recipes.search
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         default_related_name = 'recipe'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='recipe_pub_date_id_idx'
+            ),
+        )
         verbose_name = 'рецепт'
         verbose_name_plural = 'рецепты'
 
@@ -136,6 +159,57 @@ class Recipe(models.Model):
         )
 
 
+class RecipeTag(models.Model):
+    """The recipes_recipe_tags table Django used to create on its own.
+
+    Declared to carry the (tag, recipe) index, which tag filters look up
+    recipes by.
+    """
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        db_table = 'recipes_recipe_tags'
+        unique_together = ('recipe', 'tag')
+        indexes = (
+            models.Index(
+                fields=('tag', 'recipe'),
+                name='recipes_recipe_tags_tag_recipe'
+            ),
+        )
+        verbose_name = 'тег рецепта'
+        verbose_name_plural = 'теги рецептов'
+
+
+class RecipeRanking(models.Model):
+    """Popularity place, rebuilt by the refresh_recipe_ranking command."""
+    STR_PRESENTATION = '{position}. {recipe}'
+    recipe = models.OneToOneField(
+        Recipe,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='ranking',
+        verbose_name='рецепт',
+    )
+    score = models.FloatField(verbose_name='популярность')
+    position = models.PositiveIntegerField(unique=True, verbose_name='место')
+
+    class Meta:
+        ordering = ('position',)
+        verbose_name = 'место в рейтинге'
+        verbose_name_plural = 'рейтинг рецептов'
+
+    def __str__(self):
+        return self.STR_PRESENTATION.format(
+            position=self.position,
+            recipe=self.recipe.title,
+        )
+
+
 class IngredientPerRecipe(models.Model):
     STR_PRESENTATION = '{recipe} requires {amount} {unit} of {foodstuff}'
     recipe = models.ForeignKey(
@@ -0,0 +1,49 @@
+"""Full-text search over recipe titles and descriptions.
+
+Postgres keeps a Russian-stemmed tsvector, titles weighted above
+descriptions, behind a GIN index and ranks matches with ts_rank. Other
+backends (SQLite) store the casefolded text and match every word of the
+query as a substring, newest recipes first.
+"""
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connection
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = 'russian'
+NO_RANK = Value(0.0, output_field=FloatField())
+
+
+def normalize(text):
+    return ' '.join(text.casefold().replace('ё', 'е').split())
+
+
+def update_search_vectors(queryset):
+    if connection.vendor == 'postgresql':
+        queryset.update(search_vector=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        ))
+        return
+    recipes = queryset.values_list('pk', 'title', 'description')
+    for pk, title, description in recipes.iterator():
+        queryset.model.objects.filter(pk=pk).update(
+            search_vector=normalize(f'{title} {description}')
+        )
+
+
+def search_recipes(queryset, term):
+    """Matches of term annotated with their relevance as rank.
+
+    ts_rank is a float4, which its float8 decimal form, e.g. in a keyset
+    cursor, never equals; double precision ranks compare as sent.
+    """
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(term, config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(rank=Cast(
+            SearchRank(F('search_vector'), query), FloatField()
+        ))
+    for word in normalize(term).split():
+        queryset = queryset.filter(search_vector__contains=word)
+    return queryset.annotate(rank=NO_RANK)
@@ -0,0 +1,107 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from recipes.catalogue import catalogue
+from recipes.counters import count_of, increment
+from recipes.inverted_index import recipe_index
+from recipes.models import Favorite, Ingredient, IngredientPerRecipe, Recipe
+from recipes.search import update_search_vectors
+from shopping.models import ShoppingList
+from users.models import Follow, User
+
+CART_ACTIONS = ('post_add', 'post_remove', 'post_clear')
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_catalogue(sender, **kwargs):
+    catalogue.invalidate()
+
+
+@receiver(post_save, sender=Favorite)
+def count_favorite(sender, instance, created, **kwargs):
+    if created:
+        increment(
+            Recipe.objects.filter(pk=instance.recipe_id), 'favorites_count'
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+def uncount_favorite(sender, instance, **kwargs):
+    increment(
+        Recipe.objects.filter(pk=instance.recipe_id), 'favorites_count', -1
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def count_recipe(sender, instance, created, **kwargs):
+    if created:
+        increment(User.objects.filter(pk=instance.author_id), 'recipes_count')
+
+
+@receiver(post_save, sender=Recipe)
+def index_recipe(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'title', 'description'} & set(update_fields):
+        update_search_vectors(Recipe.objects.filter(pk=instance.pk))
+
+
+@receiver((post_save, post_delete), sender=IngredientPerRecipe)
+def reindex_composition(sender, instance, **kwargs):
+    """Covers deleted recipes too: their rows are cascade deleted."""
+    recipe_index.schedule_refresh(instance.recipe_id)
+
+
+@receiver(post_delete, sender=Recipe)
+def uncount_recipe(sender, instance, **kwargs):
+    increment(
+        User.objects.filter(pk=instance.author_id), 'recipes_count', -1
+    )
+
+
+@receiver(post_save, sender=Follow)
+def count_follower(sender, instance, created, **kwargs):
+    if created:
+        increment(
+            User.objects.filter(pk=instance.author_id), 'followers_count'
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def uncount_follower(sender, instance, **kwargs):
+    increment(
+        User.objects.filter(pk=instance.author_id), 'followers_count', -1
+    )
+
+
+@receiver(pre_delete, sender=Recipe)
+def uncount_in_shopping_lists(sender, instance, **kwargs):
+    """Cascade deletes of the m2m rows send no m2m_changed."""
+    increment(
+        ShoppingList.objects.filter(recipes=instance), 'recipes_count', -1
+    )
+
+
+@receiver(m2m_changed, sender=ShoppingList.recipes.through)
+def count_shopping_list_recipes(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    """Recount in one UPDATE: pk_set of a removal may hold absent recipes.
+
+    recipe.is_in_shopping_cart.clear() names no lists on post_clear, so the
+    lists holding the recipe are remembered on pre_clear.
+    """
+    if reverse and action == 'pre_clear':
+        instance._cleared_shopping_lists = list(sender.objects.filter(
+            recipe=instance
+        ).values_list('shoppinglist', flat=True))
+        return
+    if action not in CART_ACTIONS:
+        return
+    if not reverse:
+        shopping_lists = (instance.pk,)
+    elif pk_set is None:
+        shopping_lists = vars(instance).pop('_cleared_shopping_lists', ())
+    else:
+        shopping_lists = pk_set
+    ShoppingList.objects.filter(pk__in=shopping_lists).update(
+        recipes_count=count_of(sender, 'shoppinglist')
+    )
@@ -0,0 +1,32 @@
+import os
+import posixpath
+from hashlib import sha256
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASHED_NAME = '{directory}/{digest:.2}/{digest}{extension}'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Files named by the sha256 of their content, e.g. recipes/ab/ab….png.
+
+    Identical uploads end up in one file, and a name never changes its
+    content, so it may be cached by clients forever.
+    """
+    def _save(self, name, content):
+        digest = sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        name = HASHED_NAME.format(
+            directory=posixpath.dirname(name),
+            digest=digest.hexdigest(),
+            extension=posixpath.splitext(name)[1].lower(),
+        )
+        if self.exists(name):
+            # Fresh again for collect_orphaned_media, which spares new files
+            os.utime(self.path(name))
+            return name
+        return super()._save(name, content)
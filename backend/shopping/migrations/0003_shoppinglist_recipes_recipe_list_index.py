@@ -0,0 +1,16 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping', '0002_auto_20230307_1739'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX shopping_shoppinglist_recipes_recipe_list '
+            'ON shopping_shoppinglist_recipes (recipe_id, shoppinglist_id)',
+            'DROP INDEX shopping_shoppinglist_recipes_recipe_list',
+        ),
+    ]
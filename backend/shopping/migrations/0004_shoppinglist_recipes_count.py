@@ -0,0 +1,36 @@
+# Generated by Django 2.2.19 on 2026-10-18 06:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def fill_counters(apps, schema_editor):
+    ShoppingList = apps.get_model('shopping', 'ShoppingList')
+    ShoppingList.objects.update(
+        recipes_count=count_of(ShoppingList.recipes.through, 'shoppinglist')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping', '0003_shoppinglist_recipes_recipe_list_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='рецептов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
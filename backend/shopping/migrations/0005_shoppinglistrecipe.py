@@ -0,0 +1,48 @@
+# Generated by Django 2.2.19 on 2026-10-18 07:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """Takes over the auto-created m2m table, renaming the index of 0003.
+
+    Index names are limited to 30 characters, so the index of 0003 is
+    dropped and created again under a shorter name.
+    """
+
+    dependencies = [
+        ('recipes', '0012_recipetag'),
+        ('shopping', '0004_shoppinglist_recipes_count'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.CreateModel(
+                name='ShoppingListRecipe',
+                fields=[
+                    ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                    ('shoppinglist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='shopping.ShoppingList')),
+                    ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.Recipe')),
+                ],
+                options={
+                    'db_table': 'shopping_shoppinglist_recipes',
+                    'unique_together': {('shoppinglist', 'recipe')},
+                },
+            ),
+            migrations.AlterField(
+                model_name='shoppinglist',
+                name='recipes',
+                field=models.ManyToManyField(related_name='is_in_shopping_cart', through='shopping.ShoppingListRecipe', to='recipes.Recipe'),
+            ),
+        ]),
+        migrations.RunSQL(
+            'DROP INDEX shopping_shoppinglist_recipes_recipe_list',
+            'CREATE INDEX shopping_shoppinglist_recipes_recipe_list '
+            'ON shopping_shoppinglist_recipes (recipe_id, shoppinglist_id)',
+        ),
+        migrations.AddIndex(
+            model_name='shoppinglistrecipe',
+            index=models.Index(fields=['recipe', 'shoppinglist'], name='shoppinglist_recipe_list_idx'),
+        ),
+    ]
@@ -1,11 +1,14 @@
 from django.db import models
+from django.db.models import F, Sum
 
-from recipes.models import Recipe
+from fg.db.counters import CounterFieldsMixin
+from recipes.models import Ingredient, IngredientPerRecipe, Recipe
 from users.models import User
 
 
-class ShoppingList(models.Model):
+class ShoppingList(CounterFieldsMixin, models.Model):
     STR_PRESENTATION = ('{owner} fancies {recipes_number} recipes')
+    counter_fields = ('recipes_count',)
     owner = models.OneToOneField(
         User,
         null=False,
@@ -14,8 +17,14 @@ class ShoppingList(models.Model):
     )
     recipes = models.ManyToManyField(
         Recipe,
+        through='ShoppingListRecipe',
         related_name='is_in_shopping_cart'
     )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='рецептов',
+    )
 
     class Meta:
         default_related_name = 'shopping_list'
@@ -25,18 +34,61 @@ class ShoppingList(models.Model):
     def __str__(self):
         return self.STR_PRESENTATION.format(
             owner=self.owner.username,
-            recipes_number=self.recipes.count(),
+            recipes_number=self.recipes_count,
         )
 
     def calculate_ingredients(self):
-        """Get dict {<ingredient pk>:<total amount of that ingredient>}."""
-        wishlist = {}
-        for recipe in self.recipes.all():
-            for ingredient_specification in recipe.ingredients.all():
-                ingredient_pk = ingredient_specification.ingredient.pk
-                if ingredient_pk in wishlist:
-                    wishlist[ingredient_pk] = (wishlist[ingredient_pk] +
-                                               ingredient_specification.amount)
-                else:
-                    wishlist[ingredient_pk] = ingredient_specification.amount
-        return wishlist
+        """Get [{id, name, measurement_unit, amount}] sorted by name.
+
+        Amounts are summed over all the recipes in the list by a single
+        grouped query, so the cost does not depend on the list size.
+        """
+        units = dict(Ingredient.UNIT_CHOICES)
+        rows = (
+            IngredientPerRecipe.objects
+            .filter(recipe__is_in_shopping_cart=self)
+            .values('ingredient')
+            .annotate(
+                name=F('ingredient__name'),
+                unit=F('ingredient__unit'),
+                total=Sum('amount'),
+            )
+            .order_by('name', 'ingredient')
+        )
+        return [
+            {
+                'id': row['ingredient'],
+                'name': row['name'],
+                'measurement_unit': units.get(row['unit'], row['unit']),
+                'amount': row['total'],
+            }
+            for row in rows
+        ]
+
+
+class ShoppingListRecipe(models.Model):
+    """The shopping_shoppinglist_recipes table Django used to create.
+
+    Declared to carry the (recipe, shoppinglist) index, which recipe
+    deletes and cart flags look lists up by.
+    """
+    shoppinglist = models.ForeignKey(
+        ShoppingList,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    class Meta:
+        db_table = 'shopping_shoppinglist_recipes'
+        unique_together = ('shoppinglist', 'recipe')
+        indexes = (
+            models.Index(
+                fields=('recipe', 'shoppinglist'),
+                name='shoppinglist_recipe_list_idx'
+            ),
+        )